@@ -0,0 +1,245 @@
+from random import Random
+
+import numpy as np
+
+from main import CARDS, DECK_SIZE, Player, break_tie, generate_decks
+
+RED = 0
+BLUE = 1
+TIE = 2
+
+EMPTY = 0
+RED_TOKEN = 1
+BLUE_TOKEN = 2
+
+STATE_SIZE = 624
+SHIFT_SIZE = 397
+UPPER_MASK = 0x80000000
+LOWER_MASK = 0x7fffffff
+MATRIX_A = 0x9908b0df
+CHUNK_SIZE = 16384
+
+
+def keep_hands(hands):
+    return hands
+
+
+def never_exchange(hands):
+    return np.zeros(hands.shape[:2], dtype=bool)
+
+
+def get_genrand_state(seed):
+    state = [seed]
+    for index in range(1, STATE_SIZE):
+        previous = state[-1]
+        state.append(
+            (1812433253 * (previous ^ previous >> 30) + index) & 0xffffffff)
+    return state
+
+
+INITIAL_STATE = np.array(get_genrand_state(19650218), dtype=np.uint32)
+
+
+def get_seed_key(seed):
+    seed = abs(int(seed))
+    key_length = max(1, (seed.bit_length() + 31) // 32)
+    return [seed >> 32 * index & 0xffffffff for index in range(key_length)]
+
+
+def seed_states(keys):
+    # Vectorised init_by_array from CPython's _randommodule.c, one column
+    # per game.
+    count, key_length = keys.shape
+    state = np.repeat(INITIAL_STATE[:, None], count, axis=1)
+    mixed = np.empty(count, dtype=np.uint32)
+
+    def mix(index, multiplier):
+        previous = state[index - 1]
+        np.right_shift(previous, 30, out=mixed)
+        np.bitwise_xor(mixed, previous, out=mixed)
+        np.multiply(mixed, np.uint32(multiplier), out=mixed)
+        np.bitwise_xor(state[index], mixed, out=state[index])
+
+    index, key_index = 1, 0
+    for _ in range(max(STATE_SIZE, key_length)):
+        mix(index, 1664525)
+        state[index] += keys[:, key_index]
+        state[index] += np.uint32(key_index)
+        index += 1
+        key_index += 1
+        if index >= STATE_SIZE:
+            state[0] = state[-1]
+            index = 1
+        if key_index >= key_length:
+            key_index = 0
+    for _ in range(STATE_SIZE - 1):
+        mix(index, 1566083941)
+        state[index] -= np.uint32(index)
+        index += 1
+        if index >= STATE_SIZE:
+            state[0] = state[-1]
+            index = 1
+    state[0] = UPPER_MASK
+    return state
+
+
+def get_outputs(state, indices):
+    # The first twist only reads words that are still untwisted when it
+    # produces the first outputs, so they can all be computed at once.
+    y = state[indices] & UPPER_MASK | state[indices + 1] & LOWER_MASK
+    y = (state[indices + SHIFT_SIZE] ^ y >> 1 ^
+         np.where(y & 1, np.uint32(MATRIX_A), np.uint32(0)))
+    y ^= y >> 11
+    y ^= y << 7 & np.uint32(0x9d2c5680)
+    y ^= y << 15 & np.uint32(0xefc60000)
+    y ^= y >> 18
+    return y
+
+
+def seeded_decks(seeds):
+    # Same cards as generate_decks(Random(seed), 2). Random.choices picks
+    # CARDS[floor(random() * 4)], and random() takes its top bits from the
+    # first of two 32-bit outputs, so the card is that output's top two
+    # bits.
+    cards_per_game = 2 * DECK_SIZE
+    indices = np.arange(0, 2 * cards_per_game, 2)
+    cards = np.asarray(CARDS, dtype=np.int8)
+    values = [abs(int(seed)) for seed in seeds]
+    lengths = np.array([max(1, (value.bit_length() + 31) // 32)
+                        for value in values], dtype=np.intp)
+    decks = np.empty((len(values), cards_per_game), dtype=np.int8)
+    for key_length in np.unique(lengths):
+        games = np.flatnonzero(lengths == key_length)
+        for start in range(0, len(games), CHUNK_SIZE):
+            chunk = games[start:start + CHUNK_SIZE]
+            if key_length == 1:
+                keys = np.array([values[game] for game in chunk],
+                                dtype=np.uint32)[:, None]
+            else:
+                keys = np.array([get_seed_key(values[game]) for game in chunk],
+                                dtype=np.uint32)
+            outputs = get_outputs(seed_states(keys), indices)
+            decks[chunk] = cards[outputs >> 30].T
+    return decks.reshape(len(values), 2, DECK_SIZE)
+
+
+class BatchGames:
+    def __init__(self, decks, shuffle_seeds, seeds=None):
+        self.decks = np.asarray(decks, dtype=np.int8)
+        self.shuffle_seeds = [int(seed) for seed in shuffle_seeds]
+        self.seeds = seeds
+        self.count = len(self.decks)
+
+    @classmethod
+    def from_seeds(cls, seeds):
+        seeds = [int(seed) for seed in seeds]
+        return cls(seeded_decks(seeds), seeds, seeds)
+
+    @classmethod
+    def generate(cls, count, seed=None):
+        # Much faster than from_seeds, but the decks do not come from any
+        # AtonCore seed, so these games have no seeds.
+        generator = np.random.default_rng(seed)
+        decks = generator.integers(
+            CARDS[0], CARDS[-1] + 1, (count, 2, DECK_SIZE), dtype=np.int8)
+        shuffle_seeds = generator.integers(2 ** 63, size=count)
+        return cls(decks, shuffle_seeds)
+
+    def run(self, exchange=never_exchange, allocate=keep_hands,
+            temples=None):
+        self.allocate_cards(exchange, allocate)
+        self.score_cartouche1()
+        self.determine_order_of_play()
+        self.remove_tokens(temples)
+        return self
+
+    def allocate_cards(self, exchange, allocate):
+        self.exchanged = np.asarray(exchange(self.decks[:, :, :4]))
+        self.positions = np.where(self.exchanged, 8, 4)
+        hands = np.where(
+            self.exchanged[:, :, None], self.decks[:, :, 4:8],
+            self.decks[:, :, :4])
+        self.cartouches = np.asarray(allocate(hands), dtype=np.int8)
+        if not (np.sort(self.cartouches) == np.sort(hands)).all():
+            raise ValueError('Allocated cards do not match hands')
+
+    def score_cartouche1(self):
+        difference = (self.cartouches[:, RED, 0].astype(np.int16) -
+                      self.cartouches[:, BLUE, 0])
+        self.points = np.zeros((self.count, 2), dtype=np.int16)
+        self.points[:, RED] = 2 * np.maximum(difference, 0)
+        self.points[:, BLUE] = 2 * np.maximum(-difference, 0)
+
+    def determine_order_of_play(self):
+        red = self.cartouches[:, RED]
+        blue = self.cartouches[:, BLUE]
+        self.starting_players = np.select(
+            [red[:, 1] < blue[:, 1], blue[:, 1] < red[:, 1],
+             red[:, 0] < blue[:, 0], blue[:, 0] < red[:, 0]],
+            [RED, BLUE, RED, BLUE], TIE).astype(np.int8)
+        self.tie_break_cards = np.zeros(self.count, dtype=np.int16)
+
+        ties = np.flatnonzero(self.starting_players == TIE)
+        if not len(ties):
+            return
+        offsets = np.arange(DECK_SIZE)
+        positions = self.positions[ties]
+        indices = positions[:, :, None] + offsets
+        available = indices < DECK_SIZE
+        cards = np.take_along_axis(
+            self.decks[ties], np.minimum(indices, DECK_SIZE - 1), axis=2)
+        differs = ((cards[:, RED] != cards[:, BLUE]) &
+                   available[:, RED] & available[:, BLUE])
+        decided = differs.any(axis=1)
+        first = differs.argmax(axis=1)
+
+        decided_ties = ties[decided]
+        deciding_cards = cards[decided, :, first[decided]]
+        self.starting_players[decided_ties] = np.where(
+            deciding_cards[:, RED] < deciding_cards[:, BLUE], RED, BLUE)
+        self.tie_break_cards[decided_ties] = first[decided] + 1
+        self.positions[decided_ties] += first[decided, None] + 1
+
+        for game in ties[~decided]:
+            self.break_tie_with_reshuffles(game)
+
+    def break_tie_with_reshuffles(self, game):
+        random = Random(self.shuffle_seeds[game])
+        generate_decks(random, 2)
+        players = []
+        for player_index in [RED, BLUE]:
+            deck = self.decks[game, player_index].tolist()
+            position = self.positions[game, player_index]
+            player = Player(random=random, deck=deck[position:])
+            if self.exchanged[game, player_index]:
+                player.discard = deck[:4]
+            players.append(player)
+
+        red_cards, blue_cards = break_tie(*players)
+        self.starting_players[game] = (
+            RED if red_cards[-1] < blue_cards[-1] else BLUE)
+        self.tie_break_cards[game] = len(red_cards)
+
+    def remove_tokens(self, temples=None):
+        if temples is None:
+            temples = np.zeros((self.count, 4, 12), dtype=np.int8)
+        self.temples = np.array(temples, dtype=np.int8)
+
+        games = np.arange(self.count)
+        cartouches = self.cartouches[games, self.starting_players]
+        number_of_tokens = cartouches[:, 1].astype(np.int8) - 2
+        max_available_temples = cartouches[:, 2]
+        owners = np.where(
+            number_of_tokens > 0, 1 - self.starting_players,
+            self.starting_players)
+        owner_tokens = np.where(owners == RED, RED_TOKEN, BLUE_TOKEN)
+
+        available = np.arange(4) < max_available_temples[:, None]
+        owned = ((self.temples == owner_tokens[:, None, None]) &
+                 available[:, :, None])
+        token_counts = owned.sum(axis=(1, 2))
+        removing = number_of_tokens != 0
+        self.pending_removal = removing & (
+            token_counts > np.abs(number_of_tokens))
+        removed = owned & (removing & ~self.pending_removal)[:, None, None]
+        self.temples[removed] = EMPTY
@@ -0,0 +1,51 @@
+import argparse
+import time
+
+from main import AtonCore, MessageFormat
+from batch import BatchGames
+
+
+def play_scalar(batch):
+    for game in range(batch.count):
+        aton = AtonCore(seed=batch.seeds[game],
+                        message_format=MessageFormat.Structured)
+        aton.start()
+        for player in [aton.red, aton.blue]:
+            aton.execute({
+                'player': player.name,
+                'message': 'allocate_cards',
+                'cards': player.hand,
+            })
+
+
+def measure(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare BatchGames with a loop over AtonCore.')
+    parser.add_argument('--games', type=int, default=100000)
+    parser.add_argument('--scalar-games', type=int, default=10000)
+    args = parser.parse_args()
+
+    batch_seconds = measure(
+        lambda: BatchGames.generate(args.games, seed=0).run())
+    seeded_batch_seconds = measure(
+        lambda: BatchGames.from_seeds(range(args.games)).run())
+    scalar_seconds = measure(
+        play_scalar, BatchGames.from_seeds(range(args.scalar_games)))
+    scalar_rate = args.scalar_games / scalar_seconds
+
+    for name, seconds in [('BatchGames.generate', batch_seconds),
+                          ('BatchGames.from_seeds', seeded_batch_seconds)]:
+        rate = args.games / seconds
+        print('{:<24} {:>12,.0f} games/s {:>8.1f}x'.format(
+            name, rate, rate / scalar_rate))
+    print('{:<24} {:>12,.0f} games/s'.format('AtonCore', scalar_rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+from copy import deepcopy
+from random import Random
+from timeit import Timer
+
+from main import AtonCore
+
+
+def clones_per_second(clone, number=10000):
+    seconds = min(Timer(clone).repeat(repeat=3, number=number))
+    return number / seconds
+
+
+def main():
+    aton = AtonCore(seed=0)
+    aton.start()
+    random = Random(0)
+    clone = aton.clone()
+
+    results = [
+        ('copy.deepcopy', clones_per_second(lambda: deepcopy(aton), 1000)),
+        ('AtonCore.clone', clones_per_second(aton.clone)),
+        ('AtonCore.clone of a clone', clones_per_second(clone.clone)),
+        ('AtonCore.clone with shared random',
+         clones_per_second(lambda: aton.clone(random=random))),
+    ]
+    for name, rate in results:
+        print('{:<36} {:>12,.0f} clones/s'.format(name, rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import json
+from timeit import Timer
+
+from codec import decode_message, encode_message
+from main import AtonCore, MessageFormat
+
+FORMATS = [MessageFormat.Json, MessageFormat.Binary]
+
+
+def play_game(seed, message_format):
+    messages = []
+    aton = AtonCore([messages.append, messages.append], seed, message_format)
+    aton.add_spectator(messages.append, message_format)
+    aton.start()
+    for player in [aton.red, aton.blue]:
+        aton.execute({
+            'player': player.name,
+            'message': 'allocate_cards',
+            'cards': player.hand,
+        })
+    for player_name in [None, 'red', 'blue']:
+        messages.append(aton.get_view(player_name).render(message_format))
+    return messages
+
+
+def operations_per_second(function, messages, number):
+    seconds = min(Timer(lambda: list(map(function, messages))).repeat(
+        repeat=3, number=number))
+    return len(messages) * number / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare the JSON and binary message codecs.')
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--number', type=int, default=20)
+    args = parser.parse_args()
+
+    for message_format in FORMATS:
+        total_bytes = sum(
+            len(message)
+            for seed in range(args.games)
+            for message in play_game(seed, message_format))
+        print('{:<8} {:>10,.0f} bytes/game'.format(
+            message_format.name, total_bytes / args.games))
+
+    messages = [
+        message for seed in range(100)
+        for message in play_game(seed, MessageFormat.Structured)]
+    json_messages = list(map(json.dumps, messages))
+    binary_messages = list(map(encode_message, messages))
+    results = [
+        ('json encode', json.dumps, messages),
+        ('json decode', json.loads, json_messages),
+        ('binary encode', encode_message, messages),
+        ('binary decode', decode_message, binary_messages),
+    ]
+    for name, function, inputs in results:
+        print('{:<14} {:>12,.0f} messages/s'.format(
+            name, operations_per_second(function, inputs, args.number)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import time
+from threading import RLock, Thread
+
+from main import AtonCore, MessageFormat
+
+
+def play(aton):
+    aton.start()
+    for player in [aton.red, aton.blue]:
+        aton.execute({'player': player.name, 'message': 'exchange_cards'})
+    for player_name in ['red', 'blue']:
+        hand = aton.get_view(player_name).message['players'][player_name][
+            'hand']
+        aton.execute({'player': player_name, 'message': 'allocate_cards',
+                      'cards': hand})
+
+
+def run(threads, games, rounds, notifier_delay, global_lock):
+    def notifier(message):
+        time.sleep(notifier_delay)
+
+    lock = RLock() if global_lock else None
+
+    def worker(thread_number):
+        for round_number in range(rounds):
+            for game in range(thread_number, games, threads):
+                aton = AtonCore([notifier, notifier],
+                                round_number * games + game,
+                                MessageFormat.Structured)
+                aton.set_lock(lock)
+                play(aton)
+
+    workers = [Thread(target=worker, args=(thread_number,))
+               for thread_number in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return games * rounds / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Measure threaded throughput with per-game locks.')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--games', type=int, nargs='+',
+                        default=[1, 4, 16, 64])
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--notifier-delay', type=float, default=0.0005)
+    args = parser.parse_args()
+
+    for games in args.games:
+        threads = min(args.threads, games)
+        for global_lock in [False, True]:
+            rate = run(threads, games, args.rounds, args.notifier_delay,
+                       global_lock)
+            print('{:>4} games {:>3} threads {:<12} {:>10,.0f} games/s'.format(
+                games, threads, 'global lock' if global_lock else
+                'game locks', rate))
+
+
+if __name__ == '__main__':
+    main()
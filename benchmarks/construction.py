@@ -0,0 +1,44 @@
+import tracemalloc
+from timeit import Timer
+
+from main import AtonCore, GamePool
+
+
+def constructions_per_second(construct, number=10000):
+    seconds = min(Timer(construct).repeat(repeat=3, number=number))
+    return number / seconds
+
+
+def bytes_per_idle_game(count=10000):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        games = [AtonCore(seed=seed) for seed in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del games
+    return (after - before) / count
+
+
+def main():
+    seeds = iter(range(10 ** 9))
+    pool = GamePool()
+
+    def recycle():
+        pool.release(pool.acquire(seed=next(seeds)))
+
+    results = [
+        ('AtonCore()', constructions_per_second(AtonCore)),
+        ('AtonCore(seed)',
+         constructions_per_second(lambda: AtonCore(seed=next(seeds)))),
+        ('GamePool.acquire/release', constructions_per_second(recycle)),
+    ]
+    for name, rate in results:
+        print('{:<28} {:>12,.0f} games/s'.format(name, rate))
+    print('{:<28} {:>12,.0f} bytes'.format(
+        'idle game', bytes_per_idle_game()))
+
+
+if __name__ == '__main__':
+    main()
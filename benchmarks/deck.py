@@ -0,0 +1,68 @@
+from random import randint, shuffle
+from timeit import timeit
+
+from main import Player
+
+
+class SlicingPlayer:
+    def __init__(self, deck_size):
+        self.deck = [randint(1, 4) for _ in range(deck_size)]
+        self.hand = []
+        self.discard = []
+
+    def draw_cards(self):
+        self.discard.extend(self.hand)
+        self.hand = []
+
+        while len(self.hand) != 4:
+            if self.deck:
+                self.hand.append(self.deck[0])
+                self.deck = self.deck[1:]
+            else:
+                self.deck = self.discard
+                self.discard = []
+                shuffle(self.deck)
+
+    def draw_card_and_discard_it(self):
+        if not self.deck:
+            self.deck = self.discard
+            self.discard = []
+            shuffle(self.deck)
+        card = self.deck[0]
+        self.deck = self.deck[1:]
+        self.discard.append(card)
+        return card
+
+
+def make_player(deck_size):
+    player = Player('red')
+    player.deck = [randint(1, 4) for _ in range(deck_size)]
+    return player
+
+
+def drawing(player, rounds):
+    for _ in range(rounds):
+        player.draw_cards()
+        player.draw_card_and_discard_it()
+
+
+def best_time(factory, rounds, repeat):
+    times = []
+    for _ in range(repeat):
+        player = factory()
+        times.append(timeit(lambda: drawing(player, rounds), number=1))
+    return min(times)
+
+
+def main(deck_sizes=(36, 360, 3600), rounds=10000, repeat=5):
+    print('{:>10} {:>12} {:>12} {:>8}'.format(
+        'deck size', 'slicing [s]', 'cursor [s]', 'speedup'))
+    for deck_size in deck_sizes:
+        slicing = best_time(lambda: SlicingPlayer(deck_size), rounds, repeat)
+        cursor = best_time(lambda: make_player(deck_size), rounds, repeat)
+        print('{:>10} {:>12.4f} {:>12.4f} {:>7.1f}x'.format(
+            deck_size, slicing, cursor, slicing / cursor))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from main import MessageFormat
+from server import GameHost
+
+
+async def drain(connection):
+    async for _ in connection:
+        pass
+
+
+async def play(host, game_id):
+    game = host.games[game_id]
+    await host.start_game(game_id)
+    for player in [game.aton.red, game.aton.blue]:
+        await host.execute(game_id, {
+            'player': player.name,
+            'message': 'allocate_cards',
+            'cards': player.hand,
+        })
+
+
+async def run(games, message_format):
+    host = GameHost(message_format=message_format)
+    consumers = []
+    for game_index in range(games):
+        game = host.create_game(game_index, seed=game_index)
+        for player_name in ['red', 'blue', 'spectator']:
+            connection = host.connect(game.game_id, player_name)
+            consumers.append(asyncio.create_task(drain(connection)))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(play(host, game_id) for game_id in host.games))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    if not tracemalloc.is_tracing():
+        peak = None
+
+    for game_id in list(host.games):
+        host.close_game(game_id)
+    await asyncio.gather(*consumers)
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Play many concurrent games on one GameHost.')
+    parser.add_argument('--games', type=int, default=20000)
+    parser.add_argument('--format', choices=['json', 'bytes', 'binary'],
+                        default='json')
+    parser.add_argument('--trace-memory', action='store_true')
+    args = parser.parse_args()
+    message_format = {
+        'json': MessageFormat.Json,
+        'bytes': MessageFormat.Bytes,
+        'binary': MessageFormat.Binary,
+    }[args.format]
+
+    if args.trace_memory:
+        tracemalloc.start()
+    elapsed, peak = asyncio.run(run(args.games, message_format))
+    print(json.dumps({
+        'games': args.games,
+        'seconds': round(elapsed, 3),
+        'games_per_second': round(args.games / elapsed),
+        'peak_memory_mb': peak and round(peak / 2 ** 20, 1),
+    }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import time
+
+from main import MessageFormat
+from sharding import ShardRouter
+
+
+def play_games(workers, games, rounds):
+    hands = {}
+
+    def notifier(game_id, recipient, message):
+        if message['message'] == 'cards_drawn':
+            hands[game_id, recipient] = message['cards']
+
+    with ShardRouter(workers, MessageFormat.Structured, notifier) as router:
+        start = time.perf_counter()
+        for round_number in range(rounds):
+            game_ids = range(round_number * games,
+                             (round_number + 1) * games)
+            router.run([('create_game', game_id, game_id)
+                        for game_id in game_ids])
+            router.run([('start_game', game_id) for game_id in game_ids])
+            router.run([
+                ('execute', game_id, {
+                    'player': player_name,
+                    'message': 'allocate_cards',
+                    'cards': hands[game_id, player_name],
+                })
+                for game_id in game_ids for player_name in ['red', 'blue']])
+            router.run([('close_game', game_id) for game_id in game_ids])
+        return games * rounds / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Measure sharded game throughput by worker count.')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--games', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    for workers in args.workers:
+        rate = play_games(workers, args.games, args.rounds)
+        print('{:>2} workers {:>12,.0f} games/s'.format(workers, rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import argparse
+import json
+import sys
+from timeit import Timer
+
+from main import AtonCore, GamePool, MessageFormat, Player, Temple
+from simulation import play_game
+
+BENCHMARKS = {}
+
+
+def benchmark(number):
+    def register(function):
+        BENCHMARKS[function.__name__] = (function, number)
+        return function
+    return register
+
+
+@benchmark(number=20000)
+def draw_cards_with_reshuffles():
+    player = Player('red', deck=[1, 2, 3])
+    player.discard = [4, 3, 2, 1, 1, 2]
+    return player.draw_cards
+
+
+@benchmark(number=100000)
+def temple_token_counting():
+    temple = Temple()
+    temple.tokens = ['red', 'blue', '', 'red'] * 3
+    red = Player('red')
+
+    def count():
+        temple.count_player_tokens(red)
+        temple.get_player_tokens(red)
+    return count
+
+
+@benchmark(number=20000)
+def game_construction():
+    seeds = iter(range(10 ** 9))
+    return lambda: AtonCore(seed=next(seeds))
+
+
+@benchmark(number=20000)
+def pooled_game_construction():
+    seeds = iter(range(10 ** 9))
+    pool = GamePool()
+    return lambda: pool.release(pool.acquire(seed=next(seeds)))
+
+
+@benchmark(number=5000)
+def execute_pipeline():
+    seeds = iter(range(10 ** 9))
+
+    def play():
+        aton = AtonCore(seed=next(seeds))
+        aton.start()
+        for player in [aton.red, aton.blue]:
+            aton.execute(json.dumps({
+                'player': player.name,
+                'message': 'allocate_cards',
+                'cards': player.hand,
+            }))
+    return play
+
+
+def notify(message_format):
+    aton = AtonCore([len, len], seed=0, message_format=message_format)
+    message = {
+        'message': 'starting_player_selected',
+        'player': 'red',
+        'cards_used': {'red': [1, 2], 'blue': [1, 3]},
+    }
+    return lambda: aton.notify_players(message)
+
+
+@benchmark(number=50000)
+def notify_json():
+    return notify(MessageFormat.Json)
+
+
+@benchmark(number=50000)
+def notify_structured():
+    return notify(MessageFormat.Structured)
+
+
+@benchmark(number=5000)
+def simulated_games():
+    seeds = iter(range(10 ** 9))
+    return lambda: play_game(next(seeds))
+
+
+def run(names, repeat, scale):
+    results = {}
+    for name in names:
+        function, number = BENCHMARKS[name]
+        number = max(1, int(number * scale))
+        seconds = min(Timer(function()).repeat(repeat, number))
+        results[name] = {
+            'number': number,
+            'seconds': seconds,
+            'ops_per_second': number / seconds,
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]['ops_per_second']
+        ratio = result['ops_per_second'] / expected
+        result['baseline_ratio'] = ratio
+        if ratio < 1 - tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the hot paths of the engine.')
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help='one of: ' + ', '.join(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--output')
+    parser.add_argument('--baseline')
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error('unknown benchmark: {}'.format(name))
+
+    results = run(args.names or list(BENCHMARKS), args.repeat, args.scale)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(
+                results, json.load(baseline_file), args.tolerance)
+
+    for name, result in results.items():
+        line = '{:<28} {:>14,.0f} ops/s'.format(
+            name, result['ops_per_second'])
+        if 'baseline_ratio' in result:
+            line += ' {:>7.2f}x baseline'.format(result['baseline_ratio'])
+        if name in regressions:
+            line += '  REGRESSION'
+        print(line, file=sys.stderr)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    if regressions:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,363 @@
+import struct
+
+PLAYER_NAMES = [None, 'red', 'blue']
+STATE_NAMES = [
+    'Initialized', 'Allocating', 'Scoring', 'OrderOfPlay', 'RemovingTokens']
+TEMPLE_COUNT = 4
+TEMPLE_SIZE = 12
+BITS = [1 << index for index in range(TEMPLE_SIZE)]
+
+BATCH = 0
+EXCHANGE_CARDS = 1
+ALLOCATE_CARDS = 2
+REMOVE_TOKENS = 3
+CARDS_DRAWN = 16
+OPPONENT_EXCHANGED_CARDS = 17
+OPPONENT_ALLOCATED_CARDS = 18
+POINTS_SCORED = 19
+STARTING_PLAYER_SELECTED = 20
+REMOVE_TOKENS_ORDERED = 21
+TOKENS_REMOVED = 22
+GAME_STATE = 23
+
+COMMAND_TAGS = {
+    'exchange_cards': EXCHANGE_CARDS,
+    'allocate_cards': ALLOCATE_CARDS,
+    'remove_tokens': REMOVE_TOKENS,
+}
+EVENT_TAGS = {
+    'cards_drawn': CARDS_DRAWN,
+    'opponent_exchanged_cards': OPPONENT_EXCHANGED_CARDS,
+    'opponent_allocated_cards': OPPONENT_ALLOCATED_CARDS,
+    'points_scored': POINTS_SCORED,
+    'starting_player_selected': STARTING_PLAYER_SELECTED,
+    'remove_tokens': REMOVE_TOKENS_ORDERED,
+    'tokens_removed': TOKENS_REMOVED,
+    'game_state': GAME_STATE,
+}
+MESSAGE_NAMES = {tag: name for name, tag in COMMAND_TAGS.items()}
+MESSAGE_NAMES.update((tag, name) for name, tag in EVENT_TAGS.items())
+
+TAG = struct.Struct('<B')
+TAG_AND_PLAYER = struct.Struct('<BB')
+LENGTH = struct.Struct('<H')
+POINTS_SCORED_BODY = struct.Struct('<BBH')
+REMOVE_TOKENS_BODY = struct.Struct('<BBBBB')
+PLAYERS = struct.Struct('<BB')
+GAME_STATE_HEADER = struct.Struct('<BBBB')
+PLAYER_STATE = struct.Struct('<BBH')
+TEMPLE = struct.Struct('<HH')
+PENDING_REMOVAL = struct.Struct('<BBB')
+
+CAN_EXCHANGE_CARDS = 1
+ALLOCATED_CARDS = 2
+HAS_HAND = 4
+HAS_CARTOUCHES = 8
+
+
+def is_binary(data):
+    return (isinstance(data, (bytes, bytearray, memoryview)) and
+            len(data) > 0 and (data[0] == BATCH or data[0] in MESSAGE_NAMES))
+
+
+def get_player_number(player_name):
+    try:
+        return PLAYER_NAMES.index(player_name)
+    except ValueError:
+        raise ValueError('Unknown player: {}'.format(player_name))
+
+
+def pack_values(values, length=TAG):
+    return length.pack(len(values)) + bytes(values)
+
+
+def unpack_values(data, offset, length=TAG):
+    count, = length.unpack_from(data, offset)
+    offset += length.size
+    if offset + count > len(data):
+        raise IndexError('values out of range')
+    return list(data[offset:offset + count]), offset + count
+
+
+def get_mask(tokens, player_name):
+    mask = 0
+    for bit, token in zip(BITS, tokens):
+        if token == player_name:
+            mask |= bit
+    return mask
+
+
+def get_tokens(red_mask, blue_mask):
+    return ['red' if red_mask & bit else 'blue' if blue_mask & bit else ''
+            for bit in BITS]
+
+
+def get_tag(message):
+    name = message['message']
+    if name in COMMAND_TAGS and 'token_owner' not in message:
+        return COMMAND_TAGS[name]
+    if name in EVENT_TAGS:
+        return EVENT_TAGS[name]
+    raise ValueError('Unknown message: {}'.format(name))
+
+
+def encode_message(message):
+    tag = get_tag(message)
+    return encoders[tag](tag, message)
+
+
+def encode_command(tag, message):
+    data = TAG_AND_PLAYER.pack(tag, get_player_number(message['player']))
+    if tag == ALLOCATE_CARDS:
+        data += pack_values(message['cards'])
+    elif tag == REMOVE_TOKENS:
+        data += b''.join(map(pack_values, message['removed_tokens']))
+    return data
+
+
+def encode_cards_drawn(tag, message):
+    return TAG.pack(tag) + pack_values(message['cards'])
+
+
+def encode_notice(tag, message):
+    return TAG.pack(tag)
+
+
+def encode_points_scored(tag, message):
+    return POINTS_SCORED_BODY.pack(
+        tag, get_player_number(message['player']), message['points'])
+
+
+def encode_starting_player_selected(tag, message):
+    cards_used = message['cards_used']
+    return (TAG_AND_PLAYER.pack(tag, get_player_number(message['player'])) +
+            pack_values(cards_used['red'], LENGTH) +
+            pack_values(cards_used['blue'], LENGTH))
+
+
+def encode_remove_tokens(tag, message):
+    return REMOVE_TOKENS_BODY.pack(
+        tag, get_player_number(message['player']),
+        get_player_number(message['token_owner']),
+        message['number_of_tokens'], message['max_available_temple'])
+
+
+def encode_tokens_removed(tag, message):
+    return (TAG.pack(tag) + PLAYERS.pack(
+        get_player_number(message['removing_player']),
+        get_player_number(message['token_owner'])) +
+        b''.join(map(pack_values, message['removed_tokens'])))
+
+
+def encode_game_state(tag, message):
+    parts = [GAME_STATE_HEADER.pack(
+        tag, get_player_number(message['player']),
+        STATE_NAMES.index(message['state']),
+        get_player_number(message['current_player']))]
+    for player_name in PLAYER_NAMES[1:]:
+        player = message['players'][player_name]
+        flags = 0
+        if player['can_exchange_cards']:
+            flags |= CAN_EXCHANGE_CARDS
+        if player['allocated_cards']:
+            flags |= ALLOCATED_CARDS
+        if 'hand' in player:
+            flags |= HAS_HAND
+        if 'cartouches' in player:
+            flags |= HAS_CARTOUCHES
+        parts.append(PLAYER_STATE.pack(
+            flags, player['cards_left'], player['points']))
+        parts.append(pack_values(player['discard']))
+        if 'hand' in player:
+            parts.append(pack_values(player['hand']))
+        if 'cartouches' in player:
+            parts.append(pack_values(player['cartouches']))
+    for tokens in message['temples']:
+        parts.append(TEMPLE.pack(
+            get_mask(tokens, 'red'), get_mask(tokens, 'blue')))
+    pending_removal = message['pending_removal']
+    if pending_removal:
+        parts.append(PENDING_REMOVAL.pack(
+            get_player_number(pending_removal['token_owner']),
+            pending_removal['number_of_tokens'],
+            pending_removal['max_available_temple']))
+    else:
+        parts.append(PENDING_REMOVAL.pack(0, 0, 0))
+    return b''.join(parts)
+
+
+def encode_batch(messages):
+    parts = [TAG.pack(BATCH), LENGTH.pack(len(messages))]
+    for data in messages:
+        parts.append(LENGTH.pack(len(data)))
+        parts.append(data)
+    return b''.join(parts)
+
+
+def decode_message(data):
+    data = memoryview(data)
+    tag = data[0]
+    if tag == BATCH:
+        try:
+            return decode_batch(data)
+        except (IndexError, struct.error):
+            raise ValueError('Malformed message: batch')
+    if tag not in decoders:
+        raise ValueError('Unknown message type: {}'.format(tag))
+    message = {'message': MESSAGE_NAMES[tag]}
+    try:
+        message.update(decoders[tag](data))
+    except (IndexError, struct.error):
+        raise ValueError('Malformed message: {}'.format(MESSAGE_NAMES[tag]))
+    return message
+
+
+def decode_command(data):
+    tag, player = TAG_AND_PLAYER.unpack_from(data)
+    if not 1 <= player < len(PLAYER_NAMES):
+        raise ValueError('Unknown player number: {}'.format(player))
+    message = {'player': PLAYER_NAMES[player]}
+    offset = TAG_AND_PLAYER.size
+    if tag == ALLOCATE_CARDS:
+        message['cards'], offset = unpack_values(data, offset)
+    elif tag == REMOVE_TOKENS:
+        message['removed_tokens'], offset = unpack_temples(data, offset)
+    return message
+
+
+def unpack_temples(data, offset):
+    tokens = []
+    for _ in range(TEMPLE_COUNT):
+        temple_tokens, offset = unpack_values(data, offset)
+        tokens.append(temple_tokens)
+    return tokens, offset
+
+
+def decode_cards_drawn(data):
+    cards, _ = unpack_values(data, TAG.size)
+    return {'cards': cards}
+
+
+def decode_notice(data):
+    return {}
+
+
+def decode_points_scored(data):
+    _, player, points = POINTS_SCORED_BODY.unpack_from(data)
+    return {'player': PLAYER_NAMES[player], 'points': points}
+
+
+def decode_starting_player_selected(data):
+    _, player = TAG_AND_PLAYER.unpack_from(data)
+    red_cards, offset = unpack_values(data, TAG_AND_PLAYER.size, LENGTH)
+    blue_cards, _ = unpack_values(data, offset, LENGTH)
+    return {
+        'player': PLAYER_NAMES[player],
+        'cards_used': {'red': red_cards, 'blue': blue_cards},
+    }
+
+
+def decode_remove_tokens(data):
+    (_, player, token_owner, number_of_tokens,
+     max_available_temple) = REMOVE_TOKENS_BODY.unpack_from(data)
+    return {
+        'player': PLAYER_NAMES[player],
+        'token_owner': PLAYER_NAMES[token_owner],
+        'number_of_tokens': number_of_tokens,
+        'max_available_temple': max_available_temple,
+    }
+
+
+def decode_tokens_removed(data):
+    removing_player, token_owner = PLAYERS.unpack_from(data, TAG.size)
+    removed_tokens, _ = unpack_temples(data, TAG.size + PLAYERS.size)
+    return {
+        'removing_player': PLAYER_NAMES[removing_player],
+        'token_owner': PLAYER_NAMES[token_owner],
+        'removed_tokens': removed_tokens,
+    }
+
+
+def decode_game_state(data):
+    _, player, state, current_player = GAME_STATE_HEADER.unpack_from(data)
+    offset = GAME_STATE_HEADER.size
+    players = {}
+    for player_name in PLAYER_NAMES[1:]:
+        flags, cards_left, points = PLAYER_STATE.unpack_from(data, offset)
+        offset += PLAYER_STATE.size
+        public_info = {
+            'can_exchange_cards': bool(flags & CAN_EXCHANGE_CARDS),
+            'allocated_cards': bool(flags & ALLOCATED_CARDS),
+            'cards_left': cards_left,
+        }
+        public_info['discard'], offset = unpack_values(data, offset)
+        public_info['points'] = points
+        if flags & HAS_HAND:
+            public_info['hand'], offset = unpack_values(data, offset)
+        if flags & HAS_CARTOUCHES:
+            public_info['cartouches'], offset = unpack_values(data, offset)
+        players[player_name] = public_info
+    temples = []
+    for _ in range(TEMPLE_COUNT):
+        temples.append(get_tokens(*TEMPLE.unpack_from(data, offset)))
+        offset += TEMPLE.size
+    token_owner, number_of_tokens, max_available_temple = (
+        PENDING_REMOVAL.unpack_from(data, offset))
+    pending_removal = None
+    if token_owner:
+        pending_removal = {
+            'token_owner': PLAYER_NAMES[token_owner],
+            'number_of_tokens': number_of_tokens,
+            'max_available_temple': max_available_temple,
+        }
+    return {
+        'player': PLAYER_NAMES[player],
+        'state': STATE_NAMES[state],
+        'current_player': PLAYER_NAMES[current_player],
+        'players': players,
+        'temples': temples,
+        'pending_removal': pending_removal,
+    }
+
+
+def decode_batch(data):
+    count, = LENGTH.unpack_from(data, TAG.size)
+    offset = TAG.size + LENGTH.size
+    messages = []
+    for _ in range(count):
+        length, = LENGTH.unpack_from(data, offset)
+        offset += LENGTH.size
+        if offset + length > len(data):
+            raise IndexError('message out of range')
+        messages.append(decode_message(data[offset:offset + length]))
+        offset += length
+    return messages
+
+
+encoders = {
+    EXCHANGE_CARDS: encode_command,
+    ALLOCATE_CARDS: encode_command,
+    REMOVE_TOKENS: encode_command,
+    CARDS_DRAWN: encode_cards_drawn,
+    OPPONENT_EXCHANGED_CARDS: encode_notice,
+    OPPONENT_ALLOCATED_CARDS: encode_notice,
+    POINTS_SCORED: encode_points_scored,
+    STARTING_PLAYER_SELECTED: encode_starting_player_selected,
+    REMOVE_TOKENS_ORDERED: encode_remove_tokens,
+    TOKENS_REMOVED: encode_tokens_removed,
+    GAME_STATE: encode_game_state,
+}
+
+decoders = {
+    EXCHANGE_CARDS: decode_command,
+    ALLOCATE_CARDS: decode_command,
+    REMOVE_TOKENS: decode_command,
+    CARDS_DRAWN: decode_cards_drawn,
+    OPPONENT_EXCHANGED_CARDS: decode_notice,
+    OPPONENT_ALLOCATED_CARDS: decode_notice,
+    POINTS_SCORED: decode_points_scored,
+    STARTING_PLAYER_SELECTED: decode_starting_player_selected,
+    REMOVE_TOKENS_ORDERED: decode_remove_tokens,
+    TOKENS_REMOVED: decode_tokens_removed,
+    GAME_STATE: decode_game_state,
+}
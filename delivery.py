@@ -0,0 +1,121 @@
+import asyncio
+import queue
+import threading
+from enum import Enum
+
+STOP = object()
+
+
+class Overflow(Enum):
+    Block = 0
+    DropOldest = 1
+    DropNewest = 2
+    Raise = 3
+
+
+class DeliveryQueueFull(Exception):
+    pass
+
+
+class QueuedNotifier:
+    def __init__(self, notifier, maxsize=1024, overflow=Overflow.Block):
+        self.notifier = notifier
+        self.overflow = overflow
+        self.queue = queue.Queue(maxsize)
+        self.dropped = 0
+        self.failures = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def __call__(self, message):
+        if self.overflow == Overflow.Block:
+            self.queue.put(message)
+            return
+        while True:
+            try:
+                self.queue.put_nowait(message)
+                return
+            except queue.Full:
+                if self.overflow == Overflow.Raise:
+                    raise DeliveryQueueFull()
+                self.dropped += 1
+                if self.overflow == Overflow.DropNewest:
+                    return
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                continue
+            self.queue.task_done()
+
+    def run(self):
+        while True:
+            message = self.queue.get()
+            try:
+                if message is STOP:
+                    return
+                self.notifier(message)
+            except Exception:
+                self.failures += 1
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(STOP)
+        self.thread.join()
+
+
+class AsyncQueuedNotifier:
+    def __init__(self, notifier, maxsize=1024, overflow=Overflow.DropOldest):
+        if overflow == Overflow.Block:
+            raise ValueError('The engine cannot wait for an asyncio queue')
+        self.notifier = notifier
+        self.overflow = overflow
+        self.queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+        self.failures = 0
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def __call__(self, message):
+        if self.queue.full():
+            if self.overflow == Overflow.Raise:
+                raise DeliveryQueueFull()
+            self.dropped += 1
+            if self.overflow == Overflow.DropNewest:
+                return
+            self.queue.get_nowait()
+            self.queue.task_done()
+        self.queue.put_nowait(message)
+
+    async def run(self):
+        while True:
+            message = await self.queue.get()
+            try:
+                if message is STOP:
+                    return
+                result = self.notifier(message)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception:
+                self.failures += 1
+            finally:
+                self.queue.task_done()
+
+    async def flush(self):
+        await self.queue.join()
+
+    async def close(self):
+        await self.queue.put(STOP)
+        await self.task
+
+
+def queue_notifications(aton, notifier_class=QueuedNotifier, **options):
+    queued_notifiers = []
+    for subscriber in [aton.red, aton.blue] + aton.spectators:
+        if subscriber.notifier:
+            subscriber.notifier = notifier_class(subscriber.notifier,
+                                                 **options)
+            queued_notifiers.append(subscriber.notifier)
+    return queued_notifiers
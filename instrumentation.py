@@ -0,0 +1,125 @@
+import cProfile
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+
+BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def get_cumulative_counts(self):
+        cumulative_counts = []
+        total = 0
+        for count in self.counts:
+            total += count
+            cumulative_counts.append(total)
+        return cumulative_counts
+
+
+class Metrics:
+    def __init__(self, slow_notifier_threshold=0.01, buckets=BUCKETS,
+                 clock=time.perf_counter):
+        self.slow_notifier_threshold = slow_notifier_threshold
+        self.buckets = buckets
+        self.clock = clock
+        self.counters = {}
+        self.histograms = {}
+        self.lock = Lock()
+
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def call_notifier(self, notifier, message):
+        start = self.clock()
+        notifier(message)
+        elapsed = self.clock() - start
+        self.observe('aton_notifier_seconds', elapsed)
+        if elapsed > self.slow_notifier_threshold:
+            self.increment('aton_slow_notifier_calls_total')
+
+    @contextmanager
+    def profile(self):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(
+                        self.counters.items())],
+                'histograms': [
+                    {
+                        'name': name,
+                        'labels': dict(labels),
+                        'count': histogram.count,
+                        'sum': histogram.sum,
+                        'buckets': dict(zip(
+                            [*map(str, histogram.buckets), '+Inf'],
+                            histogram.get_cumulative_counts())),
+                    }
+                    for (name, labels), histogram in sorted(
+                        self.histograms.items(), key=lambda item: item[0])],
+            }
+
+    def to_prometheus(self):
+        with self.lock:
+            lines = []
+            typed_names = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in typed_names:
+                    typed_names.add(name)
+                    lines.append('# TYPE {} counter'.format(name))
+                lines.append('{}{} {}'.format(
+                    name, format_labels(labels), value))
+            for (name, labels), histogram in sorted(
+                    self.histograms.items(), key=lambda item: item[0]):
+                if name not in typed_names:
+                    typed_names.add(name)
+                    lines.append('# TYPE {} histogram'.format(name))
+                bounds = [*map(repr, histogram.buckets), '+Inf']
+                for bound, count in zip(bounds,
+                                        histogram.get_cumulative_counts()):
+                    lines.append('{}_bucket{} {}'.format(
+                        name, format_labels(labels + (('le', bound),)), count))
+                lines.append('{}_sum{} {!r}'.format(
+                    name, format_labels(labels), histogram.sum))
+                lines.append('{}_count{} {}'.format(
+                    name, format_labels(labels), histogram.count))
+            return '\n'.join(lines) + '\n'
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        '{}="{}"'.format(name, value) for name, value in labels) + '}'
@@ -0,0 +1,159 @@
+import mmap
+import os
+import struct
+import time
+from threading import RLock
+
+RECORD_HEADER = struct.Struct('<IHBB')
+RECIPIENTS = ['', 'red', 'blue']
+GAME_ID_TYPES = [int, str, bytes]
+
+
+def encode_game_id(game_id):
+    if type(game_id) not in GAME_ID_TYPES:
+        raise TypeError('Unsupported game id: {!r}'.format(game_id))
+    game_id_type = GAME_ID_TYPES.index(type(game_id))
+    if game_id_type == 0:
+        data = str(game_id).encode()
+    elif game_id_type == 1:
+        data = game_id.encode()
+    else:
+        data = game_id
+    return game_id_type, data
+
+
+def decode_game_id(game_id_type, data):
+    if game_id_type == 2:
+        return bytes(data)
+    game_id = str(data, 'utf-8')
+    if game_id_type == 0:
+        return int(game_id)
+    return game_id
+
+
+class Journal:
+    def __init__(self, path, sync_every=100, sync_interval=1.0,
+                 clock=time.monotonic):
+        self.journal_file = open(path, 'ab')
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.clock = clock
+        self.pending_records = 0
+        self.last_sync = clock()
+        self.lock = RLock()
+
+    def bind(self, game_id):
+        game_id = encode_game_id(game_id)
+
+        def record(recipient, event):
+            self.write_record(game_id, recipient, event.payload)
+        return record
+
+    def append(self, game_id, recipient, payload):
+        self.write_record(encode_game_id(game_id), recipient, payload)
+
+    def write_record(self, game_id, recipient, payload):
+        game_id_type, game_id_data = game_id
+        header = RECORD_HEADER.pack(
+            len(payload), len(game_id_data), game_id_type,
+            RECIPIENTS.index(recipient))
+        with self.lock:
+            self.journal_file.write(header + game_id_data)
+            self.journal_file.write(payload)
+            self.pending_records += 1
+            if (self.pending_records >= self.sync_every or
+                    self.clock() - self.last_sync >= self.sync_interval):
+                self.sync()
+
+    def sync(self):
+        with self.lock:
+            self.journal_file.flush()
+            os.fsync(self.journal_file.fileno())
+            self.pending_records = 0
+            self.last_sync = self.clock()
+
+    def close(self):
+        with self.lock:
+            self.sync()
+            self.journal_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JournalReader:
+    def __init__(self, path):
+        with open(path, 'rb') as journal_file:
+            if os.fstat(journal_file.fileno()).st_size:
+                self.data = mmap.mmap(
+                    journal_file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.data = b''
+        self.view = memoryview(self.data)
+        self.index = None
+
+    def read_record(self, offset):
+        game_id_start = offset + RECORD_HEADER.size
+        if game_id_start > len(self.view):
+            return None
+        length, game_id_length, game_id_type, recipient = (
+            RECORD_HEADER.unpack_from(self.view, offset))
+        payload_start = game_id_start + game_id_length
+        payload_end = payload_start + length
+        if payload_end > len(self.view):
+            return None
+        game_id = decode_game_id(
+            game_id_type, self.view[game_id_start:payload_start])
+        return (game_id, RECIPIENTS[recipient],
+                self.view[payload_start:payload_end], payload_end)
+
+    def records(self, offset=0):
+        while True:
+            record = self.read_record(offset)
+            if record is None:
+                return
+            game_id, recipient, payload, offset = record
+            yield game_id, recipient, payload
+
+    def __iter__(self):
+        return self.records()
+
+    def build_index(self):
+        self.index = {}
+        offset = 0
+        while True:
+            record = self.read_record(offset)
+            if record is None:
+                break
+            self.index.setdefault(record[0], []).append(offset)
+            offset = record[3]
+        return self.index
+
+    def game_records(self, game_id, recipient=None):
+        if self.index is None:
+            self.build_index()
+        for offset in self.index.get(game_id, []):
+            _, record_recipient, payload, _ = self.read_record(offset)
+            if recipient is None or record_recipient in ('', recipient):
+                yield record_recipient, payload
+
+    def close(self):
+        try:
+            self.view.release()
+            if isinstance(self.data, mmap.mmap):
+                self.data.close()
+        except BufferError:
+            # Payloads the caller still holds point into the mapping. It is
+            # unmapped when the last of them is released.
+            pass
+        self.view = memoryview(b'')
+        self.data = b''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
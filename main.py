@@ -1,6 +1,16 @@
-from random import randint, shuffle
+from random import Random, SystemRandom
 import json
+from contextlib import nullcontext
 from enum import Enum
+from itertools import compress, count, islice
+from operator import ne
+from threading import RLock
+
+from codec import decode_message, encode_batch, encode_message, is_binary
+
+
+class InvalidCommand(ValueError):
+    pass
 
 
 class State(Enum):
@@ -11,83 +21,551 @@ class State(Enum):
     RemovingTokens = 4
 
 
-class Player:
-    def __init__(self, name=None, notifier=None):
+CARDS = (1, 2, 3, 4)
+DECK_SIZE = 36
+
+SEED_SOURCE = SystemRandom()
+NO_LOCK = nullcontext()
+
+
+def generate_decks(random, count=1):
+    cards = random.choices(CARDS, k=DECK_SIZE * count)
+    return [cards[i:i + DECK_SIZE] for i in range(0, len(cards), DECK_SIZE)]
+
+
+class MessageFormat(Enum):
+    Json = 0
+    Structured = 1
+    Bytes = 2
+    Binary = 3
+
+
+class Event:
+    __slots__ = ('message', '_json', '_payload', '_binary')
+
+    def __init__(self, message):
+        self.message = message
+        self._json = None
+        self._payload = None
+        self._binary = None
+
+    @property
+    def json(self):
+        if self._json is None:
+            self._json = json.dumps(self.message)
+        return self._json
+
+    @property
+    def payload(self):
+        if self._payload is None:
+            self._payload = memoryview(self.json.encode())
+        return self._payload
+
+    @property
+    def binary(self):
+        if self._binary is None:
+            self._binary = encode_message(self.message)
+        return self._binary
+
+    def render(self, message_format):
+        if message_format == MessageFormat.Structured:
+            return self.message
+        if message_format == MessageFormat.Bytes:
+            return self.payload
+        if message_format == MessageFormat.Binary:
+            return self.binary
+        return self.json
+
+
+def render_events(events, message_format):
+    if message_format == MessageFormat.Structured:
+        return [event.message for event in events]
+    if message_format == MessageFormat.Bytes:
+        return memoryview(
+            b'[' + b','.join(event.payload for event in events) + b']')
+    if message_format == MessageFormat.Binary:
+        return encode_batch([event.binary for event in events])
+    return '[' + ','.join(event.json for event in events) + ']'
+
+
+class Subscriber:
+    __slots__ = ('notifier', 'message_format', 'bytes_sent', 'batch',
+                 'metrics')
+
+    def __init__(self, notifier=None, message_format=MessageFormat.Json):
+        self.notifier = notifier
+        self.message_format = message_format
+        self.bytes_sent = 0
+        self.batch = None
+        self.metrics = None
+
+    def notify(self, event):
+        self.deliver(event)
+
+    def deliver(self, event):
+        if self.notifier:
+            if not isinstance(event, Event):
+                event = Event(event)
+            if self.batch is not None:
+                self.batch.append(event)
+                return
+            self.send(event.render(self.message_format))
+
+    def send(self, message):
+        if self.message_format != MessageFormat.Structured:
+            self.bytes_sent += len(message)
+        if self.metrics is None:
+            self.notifier(message)
+        else:
+            self.metrics.call_notifier(self.notifier, message)
+
+    def start_batch(self):
+        self.batch = []
+
+    def end_batch(self):
+        batch = self.batch
+        self.batch = None
+        return batch
+
+    def flush(self):
+        self.send_batch(self.end_batch())
+
+    def send_batch(self, batch):
+        if batch and self.notifier:
+            self.send(render_events(batch, self.message_format))
+
+
+class Player(Subscriber):
+    __slots__ = ('name', 'random', 'dealer', 'can_exchange_cards',
+                 'tokens_left', '_deck', '_deck_position', 'hand',
+                 'cartouches', 'discard', 'points', 'journal')
+
+    def __init__(self, name=None, notifier=None, random=None, deck=None,
+                 message_format=MessageFormat.Json):
+        if random is None:
+            random = Random()
         self.name = name
+        self.reset(notifier, random, deck, message_format)
+
+    def reset(self, notifier, random, deck=None,
+              message_format=MessageFormat.Json):
+        super().__init__(notifier, message_format)
+        self.random = random
+        self.dealer = None
         self.can_exchange_cards = True
         self.tokens_left = 29
-        self.deck = [randint(1, 4) for _ in range(36)]
+        self._deck = None
+        self._deck_position = 0
+        if deck is not None:
+            self.deck = deck
         self.hand = []
         self.cartouches = []
         self.discard = []
         self.points = 0
-        self.notifier = notifier
+        self.journal = None
 
-    def notify(self, message):
-        if self.notifier:
-            self.notifier(message)
+    def deal(self):
+        if self.dealer is None:
+            self.deck, = generate_decks(self.random)
+        else:
+            self.dealer()
+
+    @property
+    def deck(self):
+        if self._deck is None:
+            self.deal()
+        return self._deck[self._deck_position:]
+
+    @deck.setter
+    def deck(self, cards):
+        self._deck = list(cards)
+        self._deck_position = 0
+
+    @property
+    def cards_left(self):
+        if self._deck is None:
+            self.deal()
+        return len(self._deck) - self._deck_position
+
+    def notify(self, event):
+        if self.journal:
+            if not isinstance(event, Event):
+                event = Event(event)
+            self.journal(self.name, event)
+        self.deliver(event)
+
+    def reshuffle(self):
+        if self.metrics is not None:
+            self.metrics.increment('aton_reshuffles_total', player=self.name)
+        self._deck = self.discard
+        self._deck_position = 0
+        self.discard = []
+        self.random.shuffle(self._deck)
 
     def draw_cards(self):
+        if self._deck is None:
+            self.deal()
         self.discard.extend(self.hand)
-        self.hand = []
 
-        while len(self.hand) != 4:
-            if self.deck:
-                self.hand.append(self.deck[0])
-                self.deck = self.deck[1:]
-            else:
-                self.deck = self.discard
-                self.discard = []
-                shuffle(self.deck)
+        start = self._deck_position
+        end = start + 4
+        if end <= len(self._deck):
+            self.hand = self._deck[start:end]
+            self._deck_position = end
+        else:
+            self.hand = self._deck[start:]
+            self.reshuffle()
+            end = 4 - len(self.hand)
+            self.hand.extend(self._deck[:end])
+            self._deck_position = end
 
         assert len(self.hand) == 4
 
         message = {}
         message['message'] = 'cards_drawn'
-        message['cards'] = self.hand
-        self.notify(json.dumps(message))
+        message['cards'] = list(self.hand)
+        self.notify(message)
+
+    def iter_deck(self):
+        if self._deck is None:
+            self.deal()
+        return islice(self._deck, self._deck_position, None)
+
+    def discard_cards(self, number_of_cards):
+        start = self._deck_position
+        cards = self._deck[start:start + number_of_cards]
+        self._deck_position = start + len(cards)
+        self.discard.extend(cards)
+        return cards
 
     def draw_card_and_discard_it(self):
-        if not self.deck:
-            self.deck = self.discard
-            self.discard = []
-            shuffle(self.deck)
-        card = self.deck[0]
-        self.deck = self.deck[1:]
+        if self._deck is None:
+            self.deal()
+        if self._deck_position == len(self._deck):
+            self.reshuffle()
+        card = self._deck[self._deck_position]
+        self._deck_position += 1
         self.discard.append(card)
         return card
 
+    def clone(self, random, notifier=None):
+        player = Player.__new__(Player)
+        player.notifier = notifier
+        player.message_format = self.message_format
+        player.bytes_sent = 0
+        player.batch = None
+        player.metrics = None
+        player.name = self.name
+        player.random = random
+        player.dealer = None
+        player.can_exchange_cards = self.can_exchange_cards
+        player.tokens_left = self.tokens_left
+        player._deck = self._deck
+        player._deck_position = self._deck_position
+        player.hand = self.hand
+        player.cartouches = self.cartouches
+        player.discard = self.discard[:]
+        player.points = self.points
+        player.journal = None
+        return player
+
     def __str__(self):
         return self.name
 
 
+def break_tie(red, blue):
+    red_cards = []
+    blue_cards = []
+    while True:
+        differences = map(ne, red.iter_deck(), blue.iter_deck())
+        number_of_cards = next(compress(count(1), differences), None)
+        if number_of_cards is not None:
+            red_cards += red.discard_cards(number_of_cards)
+            blue_cards += blue.discard_cards(number_of_cards)
+            return red_cards, blue_cards
+
+        number_of_cards = min(red.cards_left, blue.cards_left)
+        red_cards += red.discard_cards(number_of_cards)
+        blue_cards += blue.discard_cards(number_of_cards)
+        red_card = red.draw_card_and_discard_it()
+        blue_card = blue.draw_card_and_discard_it()
+        red_cards.append(red_card)
+        blue_cards.append(blue_card)
+        if red_card != blue_card:
+            return red_cards, blue_cards
+
+
+class TempleTokens:
+    __slots__ = ('temple',)
+
+    def __init__(self, temple):
+        self.temple = temple
+
+    def __len__(self):
+        return Temple.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.temple.get_token(i)
+                    for i in range(Temple.size)[index]]
+        return self.temple.get_token(range(Temple.size)[index])
+
+    def __setitem__(self, index, player_name):
+        index = range(Temple.size)[index]
+        if player_name:
+            self.temple.place_token(index, player_name)
+        else:
+            self.temple.remove_token(index)
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __eq__(self, other):
+        return self[:] == list(other)
+
+    def __repr__(self):
+        return repr(self[:])
+
+
+class TokenIndex:
+    __slots__ = ('temple_count', 'prefix_counts')
+
+    def __init__(self, temple_count):
+        self.temple_count = temple_count
+        self.prefix_counts = {}
+
+    def update(self, player_name, temple_number, change):
+        prefix_counts = self.prefix_counts.get(player_name)
+        if prefix_counts is None:
+            prefix_counts = [0] * (self.temple_count + 1)
+            self.prefix_counts[player_name] = prefix_counts
+        for i in range(temple_number + 1, self.temple_count + 1):
+            prefix_counts[i] += change
+
+    def count_player_tokens(self, player, temple_count):
+        prefix_counts = self.prefix_counts.get(player.name)
+        if prefix_counts is None:
+            return 0
+        return prefix_counts[temple_count]
+
+    def clone(self):
+        token_index = TokenIndex.__new__(TokenIndex)
+        token_index.temple_count = self.temple_count
+        token_index.prefix_counts = {
+            player_name: prefix_counts[:]
+            for player_name, prefix_counts in self.prefix_counts.items()}
+        return token_index
+
+
 class Temple:
-    def __init__(self):
-        self.tokens = [''] * 12
+    __slots__ = ('masks', 'counts', 'token_index', 'number')
+
+    size = 12
+
+    def __init__(self, token_index=None, number=0):
+        self.masks = {}
+        self.counts = {}
+        self.token_index = token_index
+        self.number = number
+
+    def clear(self):
+        if self.token_index is not None:
+            for player_name, number_of_tokens in self.counts.items():
+                self.token_index.update(
+                    player_name, self.number, -number_of_tokens)
+        self.masks = {}
+        self.counts = {}
+
+    @property
+    def tokens(self):
+        return TempleTokens(self)
+
+    @tokens.setter
+    def tokens(self, player_names):
+        self.clear()
+        for index, player_name in enumerate(player_names):
+            if player_name:
+                self.place_token(index, player_name)
+
+    def get_token(self, index):
+        bit = 1 << index
+        for player_name, mask in self.masks.items():
+            if mask & bit:
+                return player_name
+        return ''
+
+    def place_token(self, index, player_name):
+        self.remove_token(index)
+        self.masks[player_name] = self.masks.get(player_name, 0) | 1 << index
+        self.counts[player_name] = self.counts.get(player_name, 0) + 1
+        if self.token_index is not None:
+            self.token_index.update(player_name, self.number, 1)
+
+    def remove_token(self, index):
+        bit = 1 << index
+        for player_name, mask in self.masks.items():
+            if mask & bit:
+                self.masks[player_name] = mask ^ bit
+                self.counts[player_name] -= 1
+                if self.token_index is not None:
+                    self.token_index.update(player_name, self.number, -1)
+                return player_name
+        return ''
+
+    def set_player_mask(self, player_name, mask):
+        count = mask.bit_count()
+        change = count - self.counts.get(player_name, 0)
+        self.masks[player_name] = mask
+        self.counts[player_name] = count
+        if self.token_index is not None and change:
+            self.token_index.update(player_name, self.number, change)
+
+    def remove_player_tokens(self, player):
+        self.set_player_mask(player.name, 0)
+
+    def clone(self, token_index=None):
+        temple = Temple.__new__(Temple)
+        temple.masks = self.masks.copy()
+        temple.counts = self.counts.copy()
+        temple.token_index = token_index
+        temple.number = self.number
+        return temple
 
     def count_player_tokens(self, player):
-        return len([token for token in self.tokens if token == player.name])
+        return self.counts.get(player.name, 0)
 
     def get_player_tokens(self, player):
-        tokens = []
-        for i, token in enumerate(self.tokens):
-            if token == player.name:
-                tokens.append(i)
-        return tokens
+        return list(TOKEN_POSITIONS[self.masks.get(player.name, 0)])
+
+
+TOKEN_POSITIONS = tuple(
+    tuple(index for index in range(Temple.size) if mask >> index & 1)
+    for mask in range(1 << Temple.size))
+
+
+def get_random(seed):
+    if seed is None:
+        seed = SEED_SOURCE.getrandbits(64)
+    return seed, Random(seed)
+
+
+class ForkedRandom:
+    __slots__ = ('state', 'random')
+
+    def __init__(self, state):
+        self.state = state
+        self.random = None
+
+    def fork(self):
+        return ForkedRandom(self.getstate())
+
+    def get_random(self):
+        if self.random is None:
+            self.random = Random.__new__(Random)
+            self.random.setstate(self.state)
+            self.state = None
+        return self.random
+
+    def getstate(self):
+        if self.random is None:
+            return self.state
+        return self.random.getstate()
+
+    def setstate(self, state):
+        self.state = state
+        self.random = None
+
+    def __getattr__(self, name):
+        return getattr(self.get_random(), name)
+
+
+def fork_random(random):
+    if isinstance(random, ForkedRandom):
+        return random.fork()
+    return ForkedRandom(random.getstate())
 
 
 class AtonCore:
-    def __init__(self, notifiers=[None, None]):
+    __slots__ = ('seed', 'random', 'decks_dealt', 'finished', 'red', 'blue',
+                 'token_index', 'temples', 'spectators', 'journal', 'metrics',
+                 'views', 'updating', 'lock', 'current_player',
+                 'pending_removal', 'state')
+
+    def __init__(self, notifiers=[None, None], seed=None,
+                 message_format=MessageFormat.Json):
+        self.seed, self.random = get_random(seed)
+        self.red = Player(
+            'red', notifiers[0], self.random, None, message_format)
+        self.blue = Player(
+            'blue', notifiers[1], self.random, None, message_format)
+        self.token_index = TokenIndex(4)
+        self.temples = [Temple(self.token_index, number)
+                        for number in range(4)]
+        self.clear_state()
+
+    def reset(self, notifiers=[None, None], seed=None,
+              message_format=MessageFormat.Json):
+        self.seed, self.random = get_random(seed)
+        self.red.reset(notifiers[0], self.random, None, message_format)
+        self.blue.reset(notifiers[1], self.random, None, message_format)
+        for temple in self.temples:
+            temple.clear()
+        self.clear_state()
+
+    def clear_state(self):
+        self.decks_dealt = False
+        self.red.dealer = self.deal_decks
+        self.blue.dealer = self.deal_decks
         self.finished = False
-        self.red = Player('red', notifiers[0])
-        self.blue = Player('blue', notifiers[1])
-        self.temples = []
-        for _ in range(4):
-            self.temples.append(Temple())
+        self.spectators = []
+        self.journal = None
+        self.metrics = None
+        self.views = {}
+        self.updating = 0
+        self.lock = NO_LOCK
         self.current_player = None
+        self.pending_removal = None
 
         self.state = State.Allocating
 
+    def clone(self, notifiers=[None, None], random=None):
+        with self.lock:
+            if random is None:
+                random = fork_random(self.random)
+            aton = AtonCore.__new__(AtonCore)
+            aton.seed = self.seed
+            aton.random = random
+            aton.decks_dealt = self.decks_dealt
+            aton.finished = self.finished
+            aton.red = self.red.clone(random, notifiers[0])
+            aton.blue = self.blue.clone(random, notifiers[1])
+            aton.red.dealer = aton.deal_decks
+            aton.blue.dealer = aton.deal_decks
+            aton.token_index = self.token_index.clone()
+            aton.temples = [temple.clone(aton.token_index)
+                            for temple in self.temples]
+            aton.spectators = []
+            aton.journal = None
+            aton.metrics = None
+            aton.views = {}
+            aton.updating = 0
+            aton.lock = NO_LOCK
+            aton.current_player = aton.get_matching_player(self.current_player)
+            aton.pending_removal = None
+            if self.pending_removal:
+                token_owner, number_of_tokens, max_available_temple = (
+                    self.pending_removal)
+                aton.pending_removal = (
+                    aton.get_matching_player(token_owner), number_of_tokens,
+                    max_available_temple)
+            aton.state = self.state
+            return aton
+
+    def get_matching_player(self, player):
+        if player is None:
+            return None
+        return self.get_player_by_name(player.name)
+
     def get_other_player(self, player):
         if player is self.red:
             return self.blue
@@ -100,60 +578,223 @@ class AtonCore:
         else:
             return self.blue
 
+    def deal_decks(self):
+        if self.decks_dealt:
+            return
+        self.decks_dealt = True
+        decks = generate_decks(self.random, 2)
+        for player, deck in zip([self.red, self.blue], decks):
+            if player._deck is None:
+                player.deck = deck
+
     def start(self):
-        self.switch_to_state(self.state)
+        with self.lock:
+            self.deal_decks()
+            self.invalidate_views()
+            self.updating += 1
+            try:
+                self.switch_to_state(self.state)
+            finally:
+                self.updating -= 1
+
+    def invalidate_views(self):
+        self.views = {}
+
+    def get_view(self, player_name=None):
+        view = self.views.get(player_name)
+        if view is None:
+            with self.lock:
+                views = self.views
+                view = views.get(player_name)
+                if view is None:
+                    view = Event(self.build_view(player_name))
+                    if not self.updating:
+                        views[player_name] = view
+        return view
+
+    def build_view(self, player_name):
+        cartouches_revealed = self.state not in (
+            State.Initialized, State.Allocating)
+        players = {}
+        for player in [self.red, self.blue]:
+            public_info = {
+                'can_exchange_cards': player.can_exchange_cards,
+                'allocated_cards': bool(player.cartouches),
+                'cards_left': player.cards_left,
+                'discard': list(player.discard),
+                'points': player.points,
+            }
+            if player.name == player_name:
+                public_info['hand'] = list(player.hand)
+            if player.name == player_name or cartouches_revealed:
+                public_info['cartouches'] = list(player.cartouches)
+            players[player.name] = public_info
+        pending_removal = None
+        if self.pending_removal:
+            token_owner, number_of_tokens, max_available_temple = (
+                self.pending_removal)
+            pending_removal = {
+                'token_owner': str(token_owner),
+                'number_of_tokens': number_of_tokens,
+                'max_available_temple': max_available_temple,
+            }
+        return {
+            'message': 'game_state',
+            'player': player_name,
+            'state': self.state.name,
+            'current_player': self.current_player and str(
+                self.current_player),
+            'players': players,
+            'temples': [list(temple.tokens) for temple in self.temples],
+            'pending_removal': pending_removal,
+        }
+
+    def send_view(self, player_name):
+        self.get_player_by_name(player_name).deliver(
+            self.get_view(player_name))
 
     def switch_to_state(self, state):
-        self.state = state
-        if state == State.Allocating:
-            for player in [self.red, self.blue]:
-                player.draw_cards()
-        elif state == State.Scoring:
-            self.score_cartouche1()
-        elif state == State.OrderOfPlay:
-            self.determine_order_of_play()
-        elif state == State.RemovingTokens:
-            cartouches = self.current_player.cartouches
-            number_of_tokens = cartouches[1] - 2
-            max_available_temple = cartouches[2]
-            if number_of_tokens != 0:
-                if number_of_tokens > 0:
-                    if self.current_player is self.red:
-                        token_owner = self.blue
-                    else:
-                        token_owner = self.red
+        with self.lock:
+            metrics = self.metrics
+            while state is not None:
+                self.state = state
+                state_handler = self.state_handlers.get(state)
+                if state_handler is None:
+                    break
+                if metrics is None:
+                    state = state_handler(self)
+                else:
+                    start = metrics.clock()
+                    state = state_handler(self)
+                    metrics.observe('aton_state_seconds',
+                                    metrics.clock() - start,
+                                    state=self.state.name)
+                    metrics.increment('aton_state_transitions_total',
+                                      state=self.state.name)
+
+    def deal_cards(self):
+        for player in [self.red, self.blue]:
+            player.draw_cards()
+
+    def order_token_removal(self):
+        cartouches = self.current_player.cartouches
+        number_of_tokens = cartouches[1] - 2
+        max_available_temple = cartouches[2]
+        if number_of_tokens != 0:
+            if number_of_tokens > 0:
+                if self.current_player is self.red:
+                    token_owner = self.blue
                 else:
-                    number_of_tokens = -number_of_tokens
-                    token_owner = self.current_player
+                    token_owner = self.red
+            else:
+                number_of_tokens = -number_of_tokens
+                token_owner = self.current_player
+            token_count = self.token_index.count_player_tokens(
+                token_owner, max_available_temple)
+            if token_count > number_of_tokens:
+                self.pending_removal = (
+                    token_owner, number_of_tokens, max_available_temple)
+                self.notify_players({
+                    'message': 'remove_tokens',
+                    'player': str(self.current_player),
+                    'token_owner': str(token_owner),
+                    'number_of_tokens': number_of_tokens,
+                    'max_available_temple': max_available_temple,
+                })
+            else:
                 tokens = [[], [], [], []]
-                token_count = 0
                 for temple_index in range(max_available_temple):
                     temple = self.temples[temple_index]
-                    token_count += temple.count_player_tokens(token_owner)
-                    tokens[temple_index] = temple.get_player_tokens(
-                        token_owner)
-                if token_count > number_of_tokens:
-                    self.notify_players(json.dumps({
-                        'message': 'remove_tokens',
-                        'player': str(self.current_player),
-                        'token_owner': str(token_owner),
-                        'number_of_tokens': number_of_tokens,
-                        'max_available_temple': max_available_temple,
-                    }))
-                else:
-                    for temple_index, token_indices in enumerate(tokens):
-                        for token_index in token_indices:
-                            self.temples[temple_index].tokens[token_index] = ''
-                    self.notify_players(json.dumps({
-                        'message': 'tokens_removed',
-                        'removing_player': str(self.current_player),
-                        'token_owner': str(token_owner),
-                        'removed_tokens': tokens,
-                    }))
+                    if temple.count_player_tokens(token_owner):
+                        tokens[temple_index] = temple.get_player_tokens(
+                            token_owner)
+                        temple.remove_player_tokens(token_owner)
+                self.notify_players({
+                    'message': 'tokens_removed',
+                    'removing_player': str(self.current_player),
+                    'token_owner': str(token_owner),
+                    'removed_tokens': tokens,
+                })
+
+    def remove_tokens(self, removed_tokens):
+        token_owner, number_of_tokens, max_available_temple = (
+            self.pending_removal)
+        if len(removed_tokens) != len(self.temples):
+            return
+        if sum(map(len, removed_tokens)) != number_of_tokens:
+            return
+        for temple_index, token_indices in enumerate(removed_tokens):
+            if not token_indices:
+                continue
+            if temple_index >= max_available_temple:
+                return
+            owned_tokens = self.temples[temple_index].get_player_tokens(
+                token_owner)
+            if len(set(token_indices)) != len(token_indices):
+                return
+            if not set(token_indices).issubset(owned_tokens):
+                return
+
+        for temple_index, token_indices in enumerate(removed_tokens):
+            for token_index in token_indices:
+                self.temples[temple_index].remove_token(token_index)
+        self.pending_removal = None
+        self.notify_players({
+            'message': 'tokens_removed',
+            'removing_player': str(self.current_player),
+            'token_owner': str(token_owner),
+            'removed_tokens': removed_tokens,
+        })
+
+    @property
+    def bytes_emitted(self):
+        subscribers = [self.red, self.blue] + self.spectators
+        return sum(subscriber.bytes_sent for subscriber in subscribers)
+
+    def add_spectator(self, notifier, message_format=MessageFormat.Json):
+        with self.lock:
+            spectator = Subscriber(notifier, message_format)
+            spectator.metrics = self.metrics
+            self.spectators.append(spectator)
+            return spectator
+
+    def remove_spectator(self, spectator):
+        with self.lock:
+            self.spectators.remove(spectator)
+
+    def set_metrics(self, metrics):
+        with self.lock:
+            self.metrics = metrics
+            for subscriber in [self.red, self.blue] + self.spectators:
+                subscriber.metrics = metrics
+
+    def set_lock(self, lock=None):
+        if lock is None:
+            lock = RLock()
+        self.lock = lock
+
+    def set_journal(self, journal):
+        with self.lock:
+            self.journal = journal
+            self.red.journal = journal
+            self.blue.journal = journal
+
+    def detach(self):
+        with self.lock:
+            self.set_journal(None)
+            self.set_metrics(None)
+            self.red.notifier = None
+            self.blue.notifier = None
+            self.spectators = []
 
     def notify_players(self, message):
+        event = Event(message)
+        if self.journal:
+            self.journal('', event)
         for player in [self.red, self.blue]:
-            player.notify(message)
+            player.deliver(event)
+        for spectator in self.spectators:
+            spectator.deliver(event)
 
     def score_cartouche1(self):
         red = self.red
@@ -166,13 +807,13 @@ class AtonCore:
                 scoring_player = blue
             points = cartouche_difference * 2
             scoring_player.points += points
-            self.notify_players(json.dumps({
+            self.notify_players({
                 'message': 'points_scored',
                 'player': str(scoring_player),
                 'points': points,
-            }))
+            })
 
-        self.switch_to_state(State.OrderOfPlay)
+        return State.OrderOfPlay
 
     def determine_order_of_play(self):
         red = self.red
@@ -189,53 +830,149 @@ class AtonCore:
             elif blue.cartouches[0] < red.cartouches[0]:
                 starting_player = blue
             else:
-                while True:
-                    red_card = red.draw_card_and_discard_it()
-                    blue_card = blue.draw_card_and_discard_it()
-                    red_cards.append(red_card)
-                    blue_cards.append(blue_card)
-                    if red_card < blue_card:
-                        starting_player = red
-                        break
-                    elif blue_card < red_card:
-                        starting_player = blue
-                        break
-
-        self.notify_players(json.dumps({
+                red_cards, blue_cards = break_tie(red, blue)
+                if red_cards[-1] < blue_cards[-1]:
+                    starting_player = red
+                else:
+                    starting_player = blue
+
+        self.notify_players({
             'message': 'starting_player_selected',
             'player': str(starting_player),
             'cards_used': {
                 'red': red_cards,
                 'blue': blue_cards,
             }
-        }))
+        })
 
         self.current_player = starting_player
-        self.switch_to_state(State.RemovingTokens)
-
-    def execute(self, command_json):
-        command = json.loads(command_json)
-
-        message = command['message']
-        player = self.get_player_by_name(command['player'])
-        other_player = self.get_other_player(player)
-
-        if self.state == State.Allocating:
-            if message == 'exchange_cards':
-                if player.can_exchange_cards:
-                    player.can_exchange_cards = False
-                    other_player.notify(json.dumps({
-                        'message': 'opponent_exchanged_cards'}))
-                    player.draw_cards()
-            if message == 'allocate_cards':
-                cards = command['cards']
-                if sorted(player.hand) == sorted(cards):
-                    if not player.cartouches:
-                        player.cartouches = cards
-                        player.hand = []
-                        other_player.notify(json.dumps({
-                            'message': 'opponent_allocated_cards'
-                        }))
-
-                        if other_player.cartouches:
-                            self.switch_to_state(State.Scoring)
+        return State.RemovingTokens
+
+    def execute(self, command):
+        if not isinstance(command, dict):
+            if is_binary(command):
+                command = decode_message(command)
+            else:
+                command = json.loads(command)
+            if not isinstance(command, dict):
+                raise InvalidCommand(
+                    'Send batches of commands with execute_many')
+        if self.metrics is None:
+            return self.dispatch(command)
+
+        metrics = self.metrics
+        start = metrics.clock()
+        try:
+            self.dispatch(command)
+        except InvalidCommand:
+            metrics.increment('aton_rejected_commands_total',
+                              state=self.state.name)
+            raise
+        metrics.observe('aton_command_seconds', metrics.clock() - start,
+                        message=command['message'])
+        metrics.increment('aton_commands_total', message=command['message'])
+
+    def dispatch(self, command):
+        with self.lock:
+            command_handler = self.command_handlers.get(
+                (self.state, command['message']))
+            if command_handler is None:
+                raise InvalidCommand(
+                    'Command {} is not allowed in state {}'.format(
+                        command['message'], self.state.name))
+            self.invalidate_views()
+
+            player = self.get_player_by_name(command['player'])
+            self.updating += 1
+            try:
+                state = command_handler(self, player, command)
+                if state is not None:
+                    self.switch_to_state(state)
+            finally:
+                self.updating -= 1
+
+    def execute_many(self, commands):
+        with self.lock:
+            subscribers = [self.red, self.blue] + self.spectators
+            for subscriber in subscribers:
+                subscriber.start_batch()
+            errors = []
+            try:
+                for command in commands:
+                    try:
+                        self.execute(command)
+                    except (InvalidCommand, KeyError, TypeError,
+                            ValueError) as error:
+                        errors.append(error)
+                    else:
+                        errors.append(None)
+            finally:
+                batches = [
+                    subscriber.end_batch() for subscriber in subscribers]
+                failure = None
+                for subscriber, batch in zip(subscribers, batches):
+                    try:
+                        subscriber.send_batch(batch)
+                    except Exception as error:
+                        if failure is None:
+                            failure = error
+                if failure is not None:
+                    raise failure
+            return errors
+
+    def exchange_cards(self, player, command):
+        if player.can_exchange_cards:
+            player.can_exchange_cards = False
+            self.get_other_player(player).notify({
+                'message': 'opponent_exchanged_cards'})
+            player.draw_cards()
+
+    def allocate_cards(self, player, command):
+        cards = command['cards']
+        if sorted(player.hand) == sorted(cards):
+            if not player.cartouches:
+                other_player = self.get_other_player(player)
+                player.cartouches = cards
+                player.hand = []
+                other_player.notify({
+                    'message': 'opponent_allocated_cards'
+                })
+
+                if other_player.cartouches:
+                    return State.Scoring
+
+    def choose_tokens_to_remove(self, player, command):
+        if player is self.current_player and self.pending_removal:
+            self.remove_tokens(command['removed_tokens'])
+
+    state_handlers = {
+        State.Allocating: deal_cards,
+        State.Scoring: score_cartouche1,
+        State.OrderOfPlay: determine_order_of_play,
+        State.RemovingTokens: order_token_removal,
+    }
+
+    command_handlers = {
+        (State.Allocating, 'exchange_cards'): exchange_cards,
+        (State.Allocating, 'allocate_cards'): allocate_cards,
+        (State.RemovingTokens, 'remove_tokens'): choose_tokens_to_remove,
+    }
+
+
+class GamePool:
+    def __init__(self, size=256):
+        self.size = size
+        self.games = []
+
+    def acquire(self, notifiers=[None, None], seed=None,
+                message_format=MessageFormat.Json):
+        if not self.games:
+            return AtonCore(notifiers, seed, message_format)
+        aton = self.games.pop()
+        aton.reset(notifiers, seed, message_format)
+        return aton
+
+    def release(self, aton):
+        if len(self.games) < self.size:
+            aton.detach()
+            self.games.append(aton)
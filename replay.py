@@ -0,0 +1,152 @@
+import argparse
+import json
+from itertools import islice
+from multiprocessing import Pool
+
+from main import AtonCore, InvalidCommand, MessageFormat
+
+GAME_STARTED = 'game_started'
+GAME_FINISHED = 'game_finished'
+
+
+class CommandLog:
+    def __init__(self, log_file):
+        self.log_file = log_file
+
+    def write(self, record):
+        self.log_file.write(json.dumps(record))
+        self.log_file.write('\n')
+
+    def start(self, game_id, aton):
+        self.write({
+            'game': game_id,
+            'message': GAME_STARTED,
+            'seed': aton.seed,
+        })
+        aton.start()
+
+    def execute(self, game_id, aton, command):
+        self.write(dict(command, game=game_id))
+        aton.execute(command)
+
+    def finish(self, game_id, aton):
+        self.write({
+            'game': game_id,
+            'message': GAME_FINISHED,
+            'state': aton.state.name,
+            'points': get_points(aton),
+        })
+
+
+class ReplayResult:
+    def __init__(self, game_id, expected, actual):
+        self.game_id = game_id
+        self.expected = expected
+        self.actual = actual
+
+    @property
+    def verified(self):
+        return self.expected is not None
+
+    @property
+    def matches(self):
+        return self.expected == self.actual
+
+
+def get_points(aton):
+    return {'red': aton.red.points, 'blue': aton.blue.points}
+
+
+def read_records(lines):
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def group_games(records, unstarted_games=None):
+    games = {}
+    for record in records:
+        game_id = record.get('game')
+        if record['message'] == GAME_STARTED:
+            games[game_id] = [record]
+        elif game_id not in games:
+            if unstarted_games is not None:
+                unstarted_games.add(game_id)
+        elif record['message'] == GAME_FINISHED:
+            yield game_id, games.pop(game_id), record
+        else:
+            games[game_id].append(record)
+    for game_id, game_records in games.items():
+        yield game_id, game_records, None
+
+
+def replay_game(game_id, records, finish=None):
+    header = records[0]
+    aton = AtonCore(seed=header['seed'],
+                    message_format=MessageFormat.Structured)
+    aton.start()
+    for command in islice(records, 1, None):
+        try:
+            aton.execute(command)
+        except (InvalidCommand, KeyError, TypeError, ValueError):
+            pass
+
+    actual = {'state': aton.state.name, 'points': get_points(aton)}
+    expected = None
+    if finish is not None:
+        expected = {'state': finish['state'], 'points': finish['points']}
+    return ReplayResult(game_id, expected, actual)
+
+
+def replay_games(games, processes=None, batch_size=1000):
+    if processes == 1:
+        for game in games:
+            yield replay_game(*game)
+        return
+    games = iter(games)
+    with Pool(processes) as pool:
+        while True:
+            batch = list(islice(games, batch_size))
+            if not batch:
+                break
+            yield from pool.starmap(replay_game, batch)
+
+
+def replay(lines, processes=1, batch_size=1000, unstarted_games=None):
+    return replay_games(
+        group_games(read_records(lines), unstarted_games), processes,
+        batch_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Replay an NDJSON command log and verify final states.')
+    parser.add_argument('log')
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    games = verified = mismatched = 0
+    unstarted_games = set()
+    with open(args.log) as log_file:
+        for result in replay(log_file, args.processes, args.batch_size,
+                             unstarted_games):
+            games += 1
+            if result.verified:
+                verified += 1
+                if not result.matches:
+                    mismatched += 1
+                    print('Game {} does not match: expected {}, got {}'.format(
+                        result.game_id, result.expected, result.actual))
+    print(json.dumps({
+        'games': games,
+        'verified': verified,
+        'mismatched': mismatched,
+        'unstarted': len(unstarted_games),
+    }))
+    if mismatched:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
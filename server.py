@@ -0,0 +1,198 @@
+import asyncio
+import json
+import time
+from uuid import uuid4
+
+from main import AtonCore, Event, MessageFormat, render_events
+
+
+def render(event, message_format):
+    if isinstance(event, list):
+        return render_events(event, message_format)
+    return event.render(message_format)
+
+
+class Connection:
+    def __init__(self, game_id, player_name, queue_size, message_format):
+        self.game_id = game_id
+        self.player_name = player_name
+        self.message_format = message_format
+        self.queue = asyncio.Queue(queue_size)
+        self.closed = False
+        self.closing = asyncio.Event()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.closing.set()
+        if not self.queue.full():
+            self.queue.put_nowait(None)
+
+    async def send(self, message):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(message)
+            return
+        except asyncio.QueueFull:
+            pass
+        put = asyncio.ensure_future(self.queue.put(message))
+        closing = asyncio.ensure_future(self.closing.wait())
+        try:
+            await asyncio.wait([put, closing],
+                               return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            put.cancel()
+            closing.cancel()
+
+    async def receive(self):
+        if self.closed and self.queue.empty():
+            return None
+        return await self.queue.get()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.receive()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+
+class Game:
+    def __init__(self, game_id, seed, clock, pool=None):
+        self.game_id = game_id
+        self.outbox = []
+        self.connections = {'red': [], 'blue': [], 'spectator': []}
+        self.lock = asyncio.Lock()
+        self.closed = False
+        self.clock = clock
+        self.last_activity = clock()
+        create_game = pool.acquire if pool else AtonCore
+        self.aton = create_game(
+            [self.get_notifier('red'), self.get_notifier('blue')], seed,
+            MessageFormat.Structured)
+        self.aton.add_spectator(self.get_notifier('spectator'),
+                                MessageFormat.Structured)
+
+    def get_notifier(self, recipient):
+        def notifier(message):
+            if self.connections[recipient]:
+                self.outbox.append((recipient, message))
+        return notifier
+
+    async def deliver(self):
+        while self.outbox:
+            outbox = self.outbox
+            self.outbox = []
+            events = {}
+            for recipient, message in outbox:
+                event = events.get(id(message))
+                if event is None:
+                    if isinstance(message, list):
+                        event = [Event(item) for item in message]
+                    else:
+                        event = Event(message)
+                    events[id(message)] = event
+                for connection in list(self.connections[recipient]):
+                    await connection.send(
+                        render(event, connection.message_format))
+
+    async def run(self, operation, *args):
+        async with self.lock:
+            if self.closed:
+                raise KeyError(self.game_id)
+            self.last_activity = self.clock()
+            result = operation(*args)
+            await self.deliver()
+            return result
+
+    def close(self):
+        self.closed = True
+        for connections in self.connections.values():
+            for connection in connections:
+                connection.close()
+
+
+class GameHost:
+    def __init__(self, queue_size=64, idle_timeout=300,
+                 message_format=MessageFormat.Json, clock=time.monotonic,
+                 pool=None):
+        self.games = {}
+        self.pool = pool
+        self.releases = set()
+        self.queue_size = queue_size
+        self.idle_timeout = idle_timeout
+        self.message_format = message_format
+        self.clock = clock
+
+    def create_game(self, game_id=None, seed=None):
+        if game_id is None:
+            game_id = uuid4().hex
+        game = Game(game_id, seed, self.clock, self.pool)
+        self.games[game_id] = game
+        return game
+
+    def connect(self, game_id, player_name='spectator', message_format=None):
+        if message_format is None:
+            message_format = self.message_format
+        game = self.games[game_id]
+        connection = Connection(
+            game_id, player_name, self.queue_size, message_format)
+        game.connections[player_name].append(connection)
+        return connection
+
+    def disconnect(self, connection):
+        game = self.games.get(connection.game_id)
+        if game:
+            game.connections[connection.player_name].remove(connection)
+        connection.close()
+
+    async def start_game(self, game_id):
+        game = self.games[game_id]
+        await game.run(game.aton.start)
+
+    async def execute(self, game_id, command):
+        game = self.games[game_id]
+        await game.run(game.aton.execute, command)
+
+    async def execute_many(self, game_id, commands):
+        game = self.games[game_id]
+        return await game.run(game.aton.execute_many, commands)
+
+    async def route(self, command_json):
+        command = json.loads(command_json)
+        await self.execute(command.pop('game'), command)
+
+    def close_game(self, game_id):
+        game = self.games.pop(game_id)
+        game.close()
+        if not self.pool:
+            return
+        if game.lock.locked():
+            release = asyncio.get_running_loop().create_task(
+                self.release_game(game))
+            self.releases.add(release)
+            release.add_done_callback(self.releases.discard)
+        else:
+            self.pool.release(game.aton)
+
+    async def release_game(self, game):
+        async with game.lock:
+            self.pool.release(game.aton)
+
+    def expire_idle_games(self):
+        deadline = self.clock() - self.idle_timeout
+        expired_game_ids = [
+            game_id for game_id, game in self.games.items()
+            if game.last_activity < deadline and not game.lock.locked()]
+        for game_id in expired_game_ids:
+            self.close_game(game_id)
+        return expired_game_ids
+
+    async def expire_idle_games_forever(self, interval=10):
+        while True:
+            await asyncio.sleep(interval)
+            self.expire_idle_games()
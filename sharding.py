@@ -0,0 +1,252 @@
+import time
+import zlib
+from multiprocessing import Pipe, Process
+
+from main import AtonCore, MessageFormat
+from snapshot import restore, snapshot
+
+
+class ShardError(Exception):
+    pass
+
+
+class ShardWorker:
+    def __init__(self, message_format=MessageFormat.Json):
+        self.message_format = message_format
+        self.games = {}
+        self.outbox = []
+
+    def get_notifier(self, game_id, recipient):
+        def notifier(message):
+            if isinstance(message, memoryview):
+                message = bytes(message)
+            self.outbox.append((game_id, recipient, message))
+        return notifier
+
+    def add_game(self, game_id, aton):
+        aton.add_spectator(self.get_notifier(game_id, 'spectator'),
+                           self.message_format)
+        self.games[game_id] = aton
+
+    def get_notifiers(self, game_id):
+        return [self.get_notifier(game_id, 'red'),
+                self.get_notifier(game_id, 'blue')]
+
+    def create_game(self, game_id, seed=None):
+        self.add_game(game_id, AtonCore(
+            self.get_notifiers(game_id), seed, self.message_format))
+
+    def start_game(self, game_id):
+        self.games[game_id].start()
+
+    def execute(self, game_id, command):
+        self.games[game_id].execute(command)
+
+    def execute_many(self, game_id, commands):
+        return self.games[game_id].execute_many(commands)
+
+    def export_game(self, game_id):
+        data = snapshot(self.games[game_id])
+        del self.games[game_id]
+        return data
+
+    def import_game(self, game_id, data):
+        self.add_game(game_id, restore(
+            data, self.get_notifiers(game_id), self.message_format))
+
+    def close_game(self, game_id):
+        del self.games[game_id]
+
+    def handle(self, requests):
+        results = []
+        for operation, game_id, args in requests:
+            try:
+                results.append(self.operations[operation](
+                    self, game_id, *args))
+            except Exception as error:
+                results.append(error)
+        outbox = self.outbox
+        self.outbox = []
+        return results, outbox
+
+    operations = {
+        'create_game': create_game,
+        'start_game': start_game,
+        'execute': execute,
+        'execute_many': execute_many,
+        'export_game': export_game,
+        'import_game': import_game,
+        'close_game': close_game,
+    }
+
+
+def run_worker(connection, message_format):
+    worker = ShardWorker(message_format)
+    while True:
+        requests = connection.recv()
+        if requests is None:
+            break
+        response = worker.handle(requests)
+        try:
+            connection.send(response)
+        except Exception as error:
+            error = ShardError('Cannot send shard results: {}'.format(error))
+            connection.send(([error] * len(requests), []))
+    connection.close()
+
+
+def get_shard(game_id, shard_count):
+    return zlib.crc32(str(game_id).encode()) % shard_count
+
+
+class ShardRouter:
+    def __init__(self, workers=2, message_format=MessageFormat.Json,
+                 notifier=None, idle_timeout=300, clock=time.monotonic):
+        self.notifier = notifier
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self.connections = []
+        self.processes = []
+        self.placements = {}
+        self.last_activity = {}
+        self.notifier_failures = 0
+        for _ in range(workers):
+            connection, worker_connection = Pipe()
+            process = Process(target=run_worker,
+                              args=(worker_connection, message_format),
+                              daemon=True)
+            process.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+    def get_shard(self, game_id):
+        shard = self.placements.get(game_id)
+        if shard is None:
+            shard = get_shard(game_id, len(self.connections))
+        return shard
+
+    def run(self, operations):
+        return self.run_on_shards([
+            (self.get_shard(operation[1]), operation)
+            for operation in operations])
+
+    def run_on_shards(self, operations):
+        batches = [[] for _ in self.connections]
+        positions = [[] for _ in self.connections]
+        for position, (shard, (operation, game_id, *args)) in enumerate(
+                operations):
+            batches[shard].append((operation, game_id, args))
+            positions[shard].append(position)
+
+        for connection, batch in zip(self.connections, batches):
+            if batch:
+                connection.send(batch)
+        results = [None] * len(operations)
+        notifications = []
+        for shard, connection in enumerate(self.connections):
+            if not batches[shard]:
+                continue
+            shard_results, shard_notifications = connection.recv()
+            for position, result in zip(positions[shard], shard_results):
+                results[position] = result
+            notifications += shard_notifications
+
+        self.update_placements(operations, results)
+        if self.notifier:
+            for notification in notifications:
+                try:
+                    self.notifier(*notification)
+                except Exception:
+                    self.notifier_failures += 1
+        return results
+
+    def update_placements(self, operations, results):
+        now = self.clock()
+        for (shard, (operation, game_id, *_)), result in zip(
+                operations, results):
+            succeeded = not isinstance(result, Exception)
+            if succeeded and operation in ('create_game', 'import_game'):
+                self.placements[game_id] = shard
+                self.last_activity[game_id] = now
+            elif succeeded and operation in ('close_game', 'export_game'):
+                del self.placements[game_id]
+                del self.last_activity[game_id]
+            elif game_id in self.placements:
+                self.last_activity[game_id] = now
+
+    def call(self, operation, game_id, *args, shard=None):
+        if shard is None:
+            shard = self.get_shard(game_id)
+        result, = self.run_on_shards([(shard, (operation, game_id, *args))])
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def create_game(self, game_id, seed=None):
+        self.call('create_game', game_id, seed)
+
+    def start_game(self, game_id):
+        self.call('start_game', game_id)
+
+    def execute(self, game_id, command):
+        self.call('execute', game_id, command)
+
+    def execute_many(self, game_id, commands):
+        return self.call('execute_many', game_id, commands)
+
+    def close_game(self, game_id):
+        self.call('close_game', game_id)
+
+    def get_loads(self):
+        loads = [0] * len(self.connections)
+        for shard in self.placements.values():
+            loads[shard] += 1
+        return loads
+
+    def move_game(self, game_id, shard):
+        source = self.placements[game_id]
+        last_activity = self.last_activity[game_id]
+        data = self.call('export_game', game_id)
+        try:
+            self.call('import_game', game_id, data, shard=shard)
+        except Exception:
+            self.call('import_game', game_id, data, shard=source)
+            raise
+        finally:
+            if game_id in self.placements:
+                self.last_activity[game_id] = last_activity
+
+    def rebalance(self):
+        deadline = self.clock() - self.idle_timeout
+        loads = self.get_loads()
+        idle_game_ids = [
+            game_id for game_id, last_activity in self.last_activity.items()
+            if last_activity < deadline]
+        idle_game_ids.sort(key=lambda game_id: -loads[
+            self.placements[game_id]])
+        moved_game_ids = []
+        for game_id in idle_game_ids:
+            source = self.placements[game_id]
+            target = loads.index(min(loads))
+            if loads[source] - loads[target] <= 1:
+                continue
+            self.move_game(game_id, target)
+            loads[source] -= 1
+            loads[target] += 1
+            moved_game_ids.append(game_id)
+        return moved_game_ids
+
+    def close(self):
+        for connection in self.connections:
+            connection.send(None)
+        for process in self.processes:
+            process.join()
+        for connection in self.connections:
+            connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
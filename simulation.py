@@ -0,0 +1,209 @@
+import argparse
+import json
+from collections import Counter
+from itertools import permutations
+from multiprocessing import Pool
+from random import Random
+
+from main import AtonCore, MessageFormat
+
+
+class RandomAgent:
+    def __init__(self, random):
+        self.random = random
+
+    def exchange_cards(self, player, aton):
+        return self.random.random() < 0.5
+
+    def allocate_cards(self, player, aton):
+        cards = list(player.hand)
+        self.random.shuffle(cards)
+        return cards
+
+    def remove_tokens(self, player, aton, token_owner, number_of_tokens,
+                      max_available_temple):
+        available_tokens = [
+            (temple_index, token_index)
+            for temple_index in range(max_available_temple)
+            for token_index in aton.temples[temple_index].get_player_tokens(
+                token_owner)]
+        removed_tokens = [[], [], [], []]
+        for temple_index, token_index in sorted(
+                self.random.sample(available_tokens, number_of_tokens)):
+            removed_tokens[temple_index].append(token_index)
+        return removed_tokens
+
+
+class GreedyAgent(RandomAgent):
+    def exchange_cards(self, player, aton):
+        return max(player.hand) < 3
+
+    def allocate_cards(self, player, aton):
+        return max(permutations(player.hand), key=self.score_allocation)
+
+    def score_allocation(self, cartouches):
+        return 2 * cartouches[0] - cartouches[1] + cartouches[2]
+
+
+AGENTS = {
+    'random': RandomAgent,
+    'greedy': GreedyAgent,
+}
+
+
+class SimulationResult:
+    def __init__(self):
+        self.games = 0
+        self.wins = Counter()
+        self.points = {'red': Counter(), 'blue': Counter()}
+        self.lengths = Counter()
+
+    def add_game(self, red_points, blue_points, length):
+        self.games += 1
+        if red_points > blue_points:
+            self.wins['red'] += 1
+        elif blue_points > red_points:
+            self.wins['blue'] += 1
+        else:
+            self.wins['draw'] += 1
+        self.points['red'][red_points] += 1
+        self.points['blue'][blue_points] += 1
+        self.lengths[length] += 1
+
+    def merge(self, other):
+        self.games += other.games
+        self.wins.update(other.wins)
+        for player_name, points in other.points.items():
+            self.points[player_name].update(points)
+        self.lengths.update(other.lengths)
+
+    def win_rate(self, player_name):
+        if not self.games:
+            return 0.0
+        return self.wins[player_name] / self.games
+
+    def mean_points(self, player_name):
+        if not self.games:
+            return 0.0
+        points = self.points[player_name]
+        return sum(p * count for p, count in points.items()) / self.games
+
+    def mean_length(self):
+        if not self.games:
+            return 0.0
+        return sum(
+            length * count for length, count in self.lengths.items()
+        ) / self.games
+
+    def to_dict(self):
+        return {
+            'games': self.games,
+            'win_rates': {
+                player_name: self.win_rate(player_name)
+                for player_name in ['red', 'blue', 'draw']},
+            'mean_points': {
+                player_name: self.mean_points(player_name)
+                for player_name in ['red', 'blue']},
+            'points': {
+                player_name: dict(sorted(points.items()))
+                for player_name, points in self.points.items()},
+            'mean_length': self.mean_length(),
+            'lengths': dict(sorted(self.lengths.items())),
+        }
+
+
+def get_game_seed(seed, game_index):
+    return (seed << 32) | game_index
+
+
+def play_game(game_seed, agent_classes=(RandomAgent, RandomAgent)):
+    agent_random = Random('agents:{}'.format(game_seed))
+
+    removal_orders = []
+
+    def notifier(message):
+        if message['message'] == 'remove_tokens':
+            removal_orders.append(message)
+
+    aton = AtonCore([notifier, None], game_seed, MessageFormat.Structured)
+    agents = {
+        'red': agent_classes[0](agent_random),
+        'blue': agent_classes[1](agent_random),
+    }
+    players = [aton.red, aton.blue]
+    length = 0
+
+    aton.start()
+    for player in players:
+        if agents[player.name].exchange_cards(player, aton):
+            aton.execute({
+                'player': player.name,
+                'message': 'exchange_cards',
+            })
+            length += 1
+    for player in players:
+        aton.execute({
+            'player': player.name,
+            'message': 'allocate_cards',
+            'cards': list(agents[player.name].allocate_cards(player, aton)),
+        })
+        length += 1
+    while removal_orders:
+        order = removal_orders.pop(0)
+        player = aton.get_player_by_name(order['player'])
+        token_owner = aton.get_player_by_name(order['token_owner'])
+        aton.execute({
+            'player': player.name,
+            'message': 'remove_tokens',
+            'removed_tokens': agents[player.name].remove_tokens(
+                player, aton, token_owner, order['number_of_tokens'],
+                order['max_available_temple']),
+        })
+        length += 1
+
+    return aton.red.points, aton.blue.points, length
+
+
+def play_games(seed, game_indices, agent_classes):
+    result = SimulationResult()
+    for game_index in game_indices:
+        result.add_game(*play_game(
+            get_game_seed(seed, game_index), agent_classes))
+    return result
+
+
+def simulate(games, agent_classes=(RandomAgent, RandomAgent), seed=0,
+             processes=None, chunk_size=10000):
+    chunks = [
+        (seed, range(start, min(start + chunk_size, games)), agent_classes)
+        for start in range(0, games, chunk_size)]
+    result = SimulationResult()
+    if processes == 1:
+        partial_results = (play_games(*chunk) for chunk in chunks)
+        for partial_result in partial_results:
+            result.merge(partial_result)
+    else:
+        with Pool(processes) as pool:
+            for partial_result in pool.starmap(play_games, chunks):
+                result.merge(partial_result)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate Aton games.')
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--red', choices=AGENTS, default='random')
+    parser.add_argument('--blue', choices=AGENTS, default='random')
+    args = parser.parse_args()
+
+    result = simulate(
+        args.games, (AGENTS[args.red], AGENTS[args.blue]), args.seed,
+        args.processes, args.chunk_size)
+    print(json.dumps(result.to_dict(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
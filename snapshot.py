@@ -0,0 +1,121 @@
+import struct
+
+from main import AtonCore, MessageFormat, State
+
+MAGIC = b'AT'
+VERSION = 1
+
+FINISHED = 1
+HAS_RANDOM_STATE = 2
+HAS_GAUSS_NEXT = 4
+
+PLAYER_NAMES = ['red', 'blue']
+
+HEADER = struct.Struct('<2sBBBBBBBB')
+PLAYER = struct.Struct('<BBHBBBB')
+TEMPLE = struct.Struct('<HH')
+RANDOM_STATE = struct.Struct('<625I')
+GAUSS_NEXT = struct.Struct('<d')
+
+
+def get_player_number(player):
+    if player is None:
+        return 0
+    return PLAYER_NAMES.index(player.name) + 1
+
+
+def snapshot(aton, include_random_state=True):
+    aton.deal_decks()
+    flags = 0
+    if aton.finished:
+        flags |= FINISHED
+    if aton.pending_removal:
+        token_owner, number_of_tokens, max_available_temple = (
+            aton.pending_removal)
+    else:
+        token_owner, number_of_tokens, max_available_temple = None, 0, 0
+    if include_random_state:
+        _, random_state, gauss_next = aton.random.getstate()
+        flags |= HAS_RANDOM_STATE
+        if gauss_next is not None:
+            flags |= HAS_GAUSS_NEXT
+    seed = aton.seed.to_bytes(
+        aton.seed.bit_length() // 8 + 1, 'little', signed=True)
+
+    parts = [
+        HEADER.pack(
+            MAGIC, VERSION, flags, aton.state.value,
+            get_player_number(aton.current_player),
+            get_player_number(token_owner), number_of_tokens,
+            max_available_temple, len(seed)),
+        seed,
+    ]
+    for player in [aton.red, aton.blue]:
+        deck = player.deck
+        parts.append(PLAYER.pack(
+            player.can_exchange_cards, player.tokens_left, player.points,
+            len(deck), len(player.hand), len(player.cartouches),
+            len(player.discard)))
+        parts.append(bytes(deck))
+        parts.append(bytes(player.hand))
+        parts.append(bytes(player.cartouches))
+        parts.append(bytes(player.discard))
+    for temple in aton.temples:
+        parts.append(TEMPLE.pack(
+            temple.masks.get('red', 0), temple.masks.get('blue', 0)))
+    if include_random_state:
+        parts.append(RANDOM_STATE.pack(*random_state))
+        if gauss_next is not None:
+            parts.append(GAUSS_NEXT.pack(gauss_next))
+    return b''.join(parts)
+
+
+def restore(data, notifiers=[None, None], message_format=MessageFormat.Json):
+    data = memoryview(data)
+    (magic, version, flags, state, current_player, token_owner,
+     number_of_tokens, max_available_temple, seed_length) = (
+        HEADER.unpack_from(data))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Unsupported snapshot format')
+    offset = HEADER.size
+    seed = int.from_bytes(
+        data[offset:offset + seed_length], 'little', signed=True)
+    offset += seed_length
+
+    aton = AtonCore(notifiers, seed, message_format)
+    aton.deal_decks()
+    players = [None, aton.red, aton.blue]
+    aton.finished = bool(flags & FINISHED)
+    aton.state = State(state)
+    aton.current_player = players[current_player]
+    if token_owner:
+        aton.pending_removal = (
+            players[token_owner], number_of_tokens, max_available_temple)
+
+    for player in [aton.red, aton.blue]:
+        (can_exchange_cards, player.tokens_left, player.points, deck_length,
+         hand_length, cartouches_length, discard_length) = (
+            PLAYER.unpack_from(data, offset))
+        player.can_exchange_cards = bool(can_exchange_cards)
+        offset += PLAYER.size
+        cards = []
+        for length in [deck_length, hand_length, cartouches_length,
+                       discard_length]:
+            cards.append(list(data[offset:offset + length]))
+            offset += length
+        player.deck, player.hand, player.cartouches, player.discard = cards
+
+    for temple in aton.temples:
+        masks = TEMPLE.unpack_from(data, offset)
+        offset += TEMPLE.size
+        for player_name, mask in zip(PLAYER_NAMES, masks):
+            temple.set_player_mask(player_name, mask)
+
+    if flags & HAS_RANDOM_STATE:
+        random_state = RANDOM_STATE.unpack_from(data, offset)
+        offset += RANDOM_STATE.size
+        gauss_next = None
+        if flags & HAS_GAUSS_NEXT:
+            gauss_next, = GAUSS_NEXT.unpack_from(data, offset)
+        aton.random.setstate((3, random_state, gauss_next))
+    return aton
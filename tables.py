@@ -0,0 +1,122 @@
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+from itertools import permutations, product
+
+from main import CARDS
+
+CARTOUCHE_COUNT = len(CARDS) ** 4
+
+RED = 0
+BLUE = 1
+TIE = 2
+
+Allocation = namedtuple('Allocation', [
+    'cartouches', 'points', 'starts', 'tokens_to_remove',
+    'max_available_temple'])
+
+
+def get_cartouche_index(cartouches):
+    return ((cartouches[0] - 1) | (cartouches[1] - 1) << 2 |
+            (cartouches[2] - 1) << 4 | (cartouches[3] - 1) << 6)
+
+
+def get_cartouches(cartouche_index):
+    return tuple(
+        (cartouche_index >> shift & 3) + 1 for shift in range(0, 8, 2))
+
+
+def get_outcome_index(red_cartouches, blue_cartouches):
+    return (get_cartouche_index(red_cartouches) * CARTOUCHE_COUNT +
+            get_cartouche_index(blue_cartouches))
+
+
+class OutcomeTables:
+    def __init__(self, points=None, starting_players=None,
+                 tokens_to_remove=None, max_available_temples=None):
+        if points is None:
+            self.build()
+        else:
+            self.points = points
+            self.starting_players = starting_players
+            self.tokens_to_remove = tokens_to_remove
+            self.max_available_temples = max_available_temples
+
+    def build(self):
+        self.points = array('b')
+        self.starting_players = array('B')
+        self.tokens_to_remove = array('b')
+        self.max_available_temples = array('B')
+
+        all_cartouches = [
+            get_cartouches(index) for index in range(CARTOUCHE_COUNT)]
+        for red, blue in product(all_cartouches, repeat=2):
+            self.points.append(2 * (red[0] - blue[0]))
+            if red[1] != blue[1]:
+                starting_player = RED if red[1] < blue[1] else BLUE
+            elif red[0] != blue[0]:
+                starting_player = RED if red[0] < blue[0] else BLUE
+            else:
+                starting_player = TIE
+            self.starting_players.append(starting_player)
+        for cartouches in all_cartouches:
+            self.tokens_to_remove.append(cartouches[1] - 2)
+            self.max_available_temples.append(cartouches[2])
+
+    @classmethod
+    def load(cls, path):
+        tables = [array('b'), array('B'), array('b'), array('B')]
+        sizes = [CARTOUCHE_COUNT ** 2] * 2 + [CARTOUCHE_COUNT] * 2
+        with open(path, 'rb') as table_file:
+            for table, size in zip(tables, sizes):
+                table.fromfile(table_file, size)
+        return cls(*tables)
+
+    def save(self, path):
+        with open(path, 'wb') as table_file:
+            for table in [self.points, self.starting_players,
+                          self.tokens_to_remove, self.max_available_temples]:
+                table.tofile(table_file)
+
+    def get_outcome(self, red_cartouches, blue_cartouches):
+        outcome_index = get_outcome_index(red_cartouches, blue_cartouches)
+        return self.points[outcome_index], self.starting_players[outcome_index]
+
+    def get_removal(self, cartouches):
+        cartouche_index = get_cartouche_index(cartouches)
+        return (self.tokens_to_remove[cartouche_index],
+                self.max_available_temples[cartouche_index])
+
+    def evaluate_allocations(self, hand, opponent_cartouches,
+                             player_name='red'):
+        opponent_index = get_cartouche_index(opponent_cartouches)
+        if player_name == 'red':
+            player, sign = RED, 1
+        else:
+            player, sign = BLUE, -1
+        allocations = []
+        for cartouches in sorted(set(permutations(hand))):
+            cartouche_index = get_cartouche_index(cartouches)
+            if player == RED:
+                outcome_index = (
+                    cartouche_index * CARTOUCHE_COUNT + opponent_index)
+            else:
+                outcome_index = (
+                    opponent_index * CARTOUCHE_COUNT + cartouche_index)
+            starting_player = self.starting_players[outcome_index]
+            if starting_player == TIE:
+                starts = None
+            else:
+                starts = starting_player == player
+            allocations.append(Allocation(
+                cartouches, sign * self.points[outcome_index], starts,
+                self.tokens_to_remove[cartouche_index],
+                self.max_available_temples[cartouche_index]))
+        return allocations
+
+
+@lru_cache(maxsize=None)
+def get_tables(path=None):
+    if path is None:
+        return OutcomeTables()
+    return OutcomeTables.load(path)
@@ -0,0 +1,113 @@
+from unittest import TestCase, skipIf
+
+from main import AtonCore, MessageFormat
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+else:
+    from batch import BLUE, RED, BatchGames
+
+
+def exchange_low_hands(hands):
+    return hands.max(axis=2) < 3
+
+
+def sort_descending(hands):
+    return -np.sort(-hands, axis=2)
+
+
+@skipIf(np is None, 'NumPy is not installed')
+class TestBatchGames(TestCase):
+    def play_scalar(self, batch, game, temples=None):
+        messages = []
+        aton = AtonCore([messages.append, None], batch.shuffle_seeds[game],
+                        MessageFormat.Structured)
+        aton.red.deck = batch.decks[game, RED].tolist()
+        aton.blue.deck = batch.decks[game, BLUE].tolist()
+        if temples is not None:
+            for temple, tokens in zip(aton.temples, temples[game]):
+                temple.tokens = [['', 'red', 'blue'][t] for t in tokens]
+        aton.start()
+        for player_index, player in enumerate([aton.red, aton.blue]):
+            if batch.exchanged[game, player_index]:
+                aton.execute({
+                    'player': player.name,
+                    'message': 'exchange_cards',
+                })
+        for player_index, player in enumerate([aton.red, aton.blue]):
+            aton.execute({
+                'player': player.name,
+                'message': 'allocate_cards',
+                'cards': batch.cartouches[game, player_index].tolist(),
+            })
+        selection, = [
+            message for message in messages
+            if message['message'] == 'starting_player_selected']
+        return aton, len(selection['cards_used']['red'])
+
+    def assert_matches_scalar(self, batch, temples=None):
+        for game in range(batch.count):
+            aton, tie_break_cards = self.play_scalar(batch, game, temples)
+            self.assertEqual(
+                batch.points[game].tolist(),
+                [aton.red.points, aton.blue.points])
+            self.assertEqual(
+                batch.starting_players[game],
+                [aton.red, aton.blue].index(aton.current_player))
+            self.assertEqual(batch.tie_break_cards[game], tie_break_cards)
+            self.assertEqual(batch.pending_removal[game],
+                             aton.pending_removal is not None)
+            tokens = [
+                [{'': 0, 'red': 1, 'blue': 2}[t] for t in temple.tokens]
+                for temple in aton.temples]
+            self.assertEqual(batch.temples[game].tolist(), tokens)
+
+    def test_matches_scalar_games_with_same_seeds(self):
+        batch = BatchGames.from_seeds(range(300)).run(
+            exchange_low_hands, sort_descending)
+
+        self.assertTrue((batch.tie_break_cards > 0).any())
+        self.assert_matches_scalar(batch)
+
+    def test_seeded_decks_match_scalar_games(self):
+        seeds = list(range(200)) + [2 ** 32 - 1, 2 ** 32, 2 ** 100 + 3, -5]
+        batch = BatchGames.from_seeds(seeds)
+
+        self.assertEqual(batch.seeds, seeds)
+        for game, seed in enumerate(seeds):
+            aton = AtonCore(seed=seed)
+            self.assertEqual(batch.decks[game].tolist(),
+                             [aton.red.deck, aton.blue.deck])
+
+    def test_generated_games_have_no_seeds(self):
+        batch = BatchGames.generate(10, seed=0)
+
+        self.assertIsNone(batch.seeds)
+        self.assertEqual(len(batch.shuffle_seeds), 10)
+
+    def test_matches_scalar_games_with_reshuffles(self):
+        batch = BatchGames.generate(20, seed=1)
+        batch.decks[:, BLUE] = batch.decks[:, RED]
+        batch.run(exchange_low_hands)
+
+        self.assertTrue((batch.tie_break_cards > 32).any())
+        self.assert_matches_scalar(batch)
+
+    def test_matches_scalar_token_removal(self):
+        generator = np.random.default_rng(2)
+        temples = generator.integers(0, 3, (200, 4, 12)) * (
+            generator.random((200, 4, 12)) < 0.1)
+        batch = BatchGames.generate(200, seed=3).run(
+            allocate=sort_descending, temples=temples)
+
+        self.assertTrue(batch.pending_removal.any())
+        self.assertTrue((batch.temples != temples).any())
+        self.assert_matches_scalar(batch, temples)
+
+    def test_rejects_invalid_allocation(self):
+        batch = BatchGames.generate(10, seed=0)
+
+        with self.assertRaises(ValueError):
+            batch.run(allocate=lambda hands: np.ones_like(hands))
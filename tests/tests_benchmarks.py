@@ -0,0 +1,27 @@
+from unittest import TestCase
+
+from benchmarks.suite import BENCHMARKS, compare, run
+
+
+class TestBenchmarkSuite(TestCase):
+    def test_runs_every_benchmark(self):
+        results = run(list(BENCHMARKS), repeat=1, scale=0.0001)
+
+        self.assertEqual(list(results), list(BENCHMARKS))
+        for result in results.values():
+            self.assertGreater(result['ops_per_second'], 0)
+
+    def test_reports_regressions_against_baseline(self):
+        results = {
+            'fast': {'ops_per_second': 95.0},
+            'slow': {'ops_per_second': 50.0},
+            'new': {'ops_per_second': 10.0},
+        }
+        baseline = {
+            'fast': {'ops_per_second': 100.0},
+            'slow': {'ops_per_second': 100.0},
+        }
+
+        self.assertEqual(compare(results, baseline, 0.1), ['slow'])
+        self.assertAlmostEqual(results['fast']['baseline_ratio'], 0.95)
+        self.assertNotIn('baseline_ratio', results['new'])
@@ -0,0 +1,98 @@
+from random import Random
+from unittest import TestCase
+from unittest.mock import Mock
+
+from main import AtonCore, State
+
+
+class TestClone(TestCase):
+    def setUp(self):
+        self.notifiers = [Mock(), Mock()]
+        self.aton = AtonCore(self.notifiers, seed=11)
+        self.aton.start()
+
+    def play(self, aton):
+        aton.execute({'player': 'red', 'message': 'exchange_cards'})
+        for player in [aton.red, aton.blue]:
+            aton.execute({
+                'player': player.name,
+                'message': 'allocate_cards',
+                'cards': player.hand,
+            })
+
+    def get_state(self, aton):
+        return [
+            aton.state, str(aton.current_player),
+            [(player.deck, player.hand, player.cartouches, player.discard,
+              player.points, player.can_exchange_cards)
+             for player in [aton.red, aton.blue]],
+            [list(temple.tokens) for temple in aton.temples],
+        ]
+
+    def test_clone_does_not_change_original(self):
+        state = self.get_state(self.aton)
+        clone = self.aton.clone()
+
+        self.play(clone)
+        clone.temples[0].tokens[0] = 'red'
+
+        self.assertEqual(self.get_state(self.aton), state)
+        self.assertNotEqual(self.get_state(clone), state)
+        self.assertEqual(clone.state, State.RemovingTokens)
+
+    def test_clone_continues_like_original(self):
+        clone = self.aton.clone()
+
+        self.play(clone)
+        self.play(self.aton)
+
+        self.assertEqual(self.get_state(clone), self.get_state(self.aton))
+
+    def test_clone_has_own_notifiers(self):
+        notifier = Mock()
+        self.notifiers[0].reset_mock()
+
+        clone = self.aton.clone([notifier, None])
+        self.play(clone)
+
+        self.notifiers[0].assert_not_called()
+        notifier.assert_called()
+        self.assertIsNot(clone.red, self.aton.red)
+        self.assertIs(clone.get_other_player(clone.red), clone.blue)
+
+    def test_clone_uses_given_random(self):
+        random = Random(3)
+
+        clone = self.aton.clone(random=random)
+
+        self.assertIs(clone.random, random)
+        self.assertIs(clone.red.random, random)
+        self.assertIs(clone.blue.random, random)
+
+    def test_clone_keeps_pending_removal(self):
+        aton = self.aton
+        aton.red.cartouches = [1, 4, 3, 4]
+        for i in range(4):
+            aton.temples[i].tokens[0] = 'blue'
+        aton.current_player = aton.red
+        aton.state = State.RemovingTokens
+        aton.start()
+
+        clone = aton.clone()
+
+        self.assertIs(clone.current_player, clone.red)
+        self.assertEqual(clone.pending_removal, (clone.blue, 2, 3))
+
+    def test_clones_of_clones_share_generator_state_until_used(self):
+        clone = self.aton.clone()
+        first = clone.clone()
+        second = clone.clone()
+
+        self.assertIs(first.random.getstate(), second.random.getstate())
+        for aton in [self.aton, clone, first, second]:
+            for _ in range(40):
+                aton.red.draw_card_and_discard_it()
+        self.assertEqual(self.get_state(first), self.get_state(self.aton))
+        self.assertEqual(self.get_state(second), self.get_state(self.aton))
+        self.assertEqual(self.get_state(clone), self.get_state(self.aton))
+        self.assertEqual(first.random.getstate(), self.aton.random.getstate())
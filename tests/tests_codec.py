@@ -0,0 +1,196 @@
+import json
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from codec import (
+    STATE_NAMES, decode_message, encode_batch, encode_message, is_binary)
+from main import AtonCore, Event, InvalidCommand, MessageFormat, State
+from server import GameHost
+
+MESSAGES = [
+    {'message': 'exchange_cards', 'player': 'red'},
+    {'message': 'allocate_cards', 'player': 'blue', 'cards': [4, 1, 3, 2]},
+    {'message': 'remove_tokens', 'player': 'red',
+     'removed_tokens': [[3, 0], [], [11], []]},
+    {'message': 'cards_drawn', 'cards': [1, 2, 3, 4]},
+    {'message': 'opponent_exchanged_cards'},
+    {'message': 'opponent_allocated_cards'},
+    {'message': 'points_scored', 'player': 'blue', 'points': 6},
+    {'message': 'starting_player_selected', 'player': 'red',
+     'cards_used': {'red': [], 'blue': []}},
+    {'message': 'starting_player_selected', 'player': 'blue',
+     'cards_used': {'red': [2] * 300 + [3], 'blue': [2] * 300 + [1]}},
+    {'message': 'remove_tokens', 'player': 'blue', 'token_owner': 'red',
+     'number_of_tokens': 2, 'max_available_temple': 3},
+    {'message': 'tokens_removed', 'removing_player': 'red',
+     'token_owner': 'blue', 'removed_tokens': [[0, 5], [1], [], [11]]},
+]
+
+
+def get_views():
+    aton = AtonCore(seed=4)
+    views = [aton.get_view(), aton.get_view('red')]
+    aton.start()
+    aton.execute({'player': 'red', 'message': 'exchange_cards'})
+    aton.temples[1].tokens = ['red', 'blue', ''] * 4
+    aton.red.cartouches = [1, 1, 2, 1]
+    aton.blue.cartouches = [1, 4, 3, 1]
+    aton.state = State.Scoring
+    aton.start()
+    for player_name in [None, 'red', 'blue']:
+        views.append(aton.get_view(player_name))
+    return [view.message for view in views]
+
+
+class TestCodec(TestCase):
+    def test_round_trips_every_message(self):
+        for message in MESSAGES + get_views():
+            data = encode_message(message)
+
+            self.assertTrue(is_binary(data))
+            self.assertEqual(decode_message(data), message)
+
+    def test_views_include_pending_removal(self):
+        views = get_views()
+
+        self.assertIsNotNone(views[-1]['pending_removal'])
+        self.assertIn('hand', views[-1]['players']['blue'])
+
+    def test_is_much_smaller_than_json(self):
+        for message in MESSAGES[:-3] + get_views():
+            self.assertLess(len(encode_message(message)),
+                            len(json.dumps(message)) / 3)
+
+    def test_round_trips_batches(self):
+        data = encode_batch([encode_message(message) for message in MESSAGES])
+
+        self.assertEqual(decode_message(data), MESSAGES)
+
+    def test_rejects_unknown_and_malformed_messages(self):
+        with self.assertRaises(ValueError):
+            encode_message({'message': 'unknown'})
+        with self.assertRaises(ValueError):
+            encode_message({'message': 'exchange_cards', 'player': 'green'})
+        with self.assertRaises(ValueError):
+            decode_message(b'\x7f')
+        with self.assertRaises(ValueError):
+            decode_message(encode_message(MESSAGES[1])[:-1])
+        self.assertFalse(is_binary(json.dumps(MESSAGES[0]).encode()))
+
+    def test_rejects_truncated_batches(self):
+        data = encode_batch([encode_message(message) for message in MESSAGES])
+
+        for end in [2, 5, len(data) - 1]:
+            with self.assertRaises(ValueError):
+                decode_message(data[:end])
+
+    def test_rejects_commands_without_a_player(self):
+        with self.assertRaises(ValueError):
+            decode_message(b'\x01\x00')
+        with self.assertRaises(ValueError):
+            decode_message(b'\x01\x03')
+
+    def test_state_names_match_engine(self):
+        self.assertEqual(STATE_NAMES, [state.name for state in State])
+
+
+class TestBinaryFormat(TestCase):
+    def test_executes_binary_commands_and_sends_binary_events(self):
+        messages = []
+        aton = AtonCore([messages.append, None], seed=1,
+                        message_format=MessageFormat.Binary)
+        aton.start()
+
+        aton.execute(encode_message(
+            {'message': 'exchange_cards', 'player': 'red'}))
+
+        self.assertFalse(aton.red.can_exchange_cards)
+        self.assertEqual([decode_message(message) for message in messages], [
+            {'message': 'cards_drawn', 'cards': aton.red.discard},
+            {'message': 'cards_drawn', 'cards': aton.red.hand},
+        ])
+        self.assertEqual(aton.bytes_emitted, 12)
+
+    def test_rejects_binary_batches_of_commands(self):
+        aton = AtonCore(seed=1)
+        aton.start()
+
+        with self.assertRaises(InvalidCommand):
+            aton.execute(encode_batch([encode_message(
+                {'message': 'exchange_cards', 'player': 'red'})]))
+        self.assertTrue(aton.red.can_exchange_cards)
+
+    def test_reports_truncated_batches_per_command(self):
+        aton = AtonCore(seed=1)
+        aton.start()
+
+        errors = aton.execute_many([
+            b'\x00\x01',
+            encode_message({'message': 'exchange_cards', 'player': 'red'}),
+        ])
+
+        self.assertIsInstance(errors[0], ValueError)
+        self.assertIsNone(errors[1])
+        self.assertFalse(aton.red.can_exchange_cards)
+
+    def test_batches_binary_events(self):
+        messages = []
+        aton = AtonCore([messages.append, None], seed=1,
+                        message_format=MessageFormat.Binary)
+        aton.start()
+        messages.clear()
+
+        aton.execute_many([
+            {'message': 'exchange_cards', 'player': 'blue'},
+            {'message': 'allocate_cards', 'player': 'red',
+             'cards': aton.red.hand},
+        ])
+
+        message, = messages
+        self.assertEqual(decode_message(message), [
+            {'message': 'opponent_exchanged_cards'}])
+
+    def test_renders_event_once(self):
+        event = Event(MESSAGES[3])
+
+        self.assertIs(event.render(MessageFormat.Binary), event.binary)
+
+
+class TestNegotiation(IsolatedAsyncioTestCase):
+    async def test_connections_choose_their_format(self):
+        host = GameHost()
+        host.create_game('a', seed=1)
+        json_connection = host.connect('a', 'red')
+        binary_connection = host.connect('a', 'red', MessageFormat.Binary)
+
+        await host.start_game('a')
+
+        self.assertEqual(
+            json.loads(await json_connection.receive()),
+            decode_message(await binary_connection.receive()))
+
+    async def test_batches_reach_connections_in_every_format(self):
+        host = GameHost()
+        host.create_game('a', seed=1)
+        connections = {
+            message_format: host.connect('a', 'blue', message_format)
+            for message_format in MessageFormat}
+        await host.start_game('a')
+        for connection in connections.values():
+            await connection.receive()
+
+        await host.execute_many('a', [
+            {'message': 'exchange_cards', 'player': 'red'},
+            {'message': 'exchange_cards', 'player': 'blue'},
+        ])
+
+        messages = {message_format: await connection.receive()
+                    for message_format, connection in connections.items()}
+        expected = messages[MessageFormat.Structured]
+        self.assertEqual(
+            [message['message'] for message in expected],
+            ['opponent_exchanged_cards', 'cards_drawn'])
+        self.assertEqual(json.loads(messages[MessageFormat.Json]), expected)
+        self.assertEqual(
+            json.loads(bytes(messages[MessageFormat.Bytes])), expected)
+        self.assertEqual(
+            decode_message(messages[MessageFormat.Binary]), expected)
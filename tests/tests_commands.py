@@ -0,0 +1,141 @@
+import inspect
+import json
+from unittest import TestCase
+from unittest.mock import Mock
+
+from main import AtonCore, InvalidCommand, MessageFormat, State
+
+
+class TestCommands(TestCase):
+    def test_rejects_unknown_commands(self):
+        aton = AtonCore()
+        aton.start()
+
+        with self.assertRaises(InvalidCommand):
+            aton.execute(json.dumps({
+                'player': 'red',
+                'message': 'place_tokens',
+            }))
+
+    def test_rejects_commands_from_other_states(self):
+        notifiers = [Mock(), Mock()]
+        aton = AtonCore(notifiers)
+        aton.start()
+        for notifier in notifiers:
+            notifier.reset_mock()
+
+        with self.assertRaises(InvalidCommand):
+            aton.execute({
+                'player': 'red',
+                'message': 'remove_tokens',
+                'removed_tokens': [[], [], [], []],
+            })
+
+        aton.state = State.RemovingTokens
+        with self.assertRaises(InvalidCommand):
+            aton.execute({'player': 'red', 'message': 'exchange_cards'})
+
+        for notifier in notifiers:
+            notifier.assert_not_called()
+        self.assertTrue(aton.red.can_exchange_cards)
+
+    def test_runs_transitions_without_recursion(self):
+        aton = AtonCore(seed=0)
+        aton.red.cartouches = [3, 1, 1, 1]
+        aton.blue.cartouches = [1, 1, 1, 1]
+        aton.state = State.Scoring
+        depths = []
+
+        def notifier(message):
+            depths.append(len(inspect.stack(0)))
+        aton.red.notifier = notifier
+
+        aton.start()
+
+        self.assertEqual(len(depths), 3)
+        self.assertEqual(depths[0], depths[1])
+        self.assertEqual(depths[1], depths[2])
+        self.assertEqual(aton.state, State.RemovingTokens)
+
+    def test_executes_many_commands_with_one_flush(self):
+        notifiers = [Mock(), Mock()]
+        aton = AtonCore(notifiers, seed=1)
+        spectator_notifier = Mock()
+        aton.add_spectator(spectator_notifier)
+        aton.start()
+        for notifier in notifiers:
+            notifier.reset_mock()
+        bytes_emitted = aton.bytes_emitted
+
+        errors = aton.execute_many([
+            {'player': 'red', 'message': 'exchange_cards'},
+            {'player': 'red', 'message': 'unknown'},
+            {'player': 'red', 'message': 'allocate_cards'},
+            json.dumps({
+                'player': 'blue',
+                'message': 'allocate_cards',
+                'cards': aton.blue.hand,
+            }),
+        ])
+
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], InvalidCommand)
+        self.assertIsInstance(errors[2], KeyError)
+        self.assertIsNone(errors[3])
+        notifiers[0].assert_called_once()
+        notifiers[1].assert_called_once()
+        spectator_notifier.assert_not_called()
+        red_messages = json.loads(notifiers[0].call_args[0][0])
+        blue_messages = json.loads(notifiers[1].call_args[0][0])
+        self.assertEqual(
+            [message['message'] for message in red_messages],
+            ['cards_drawn', 'opponent_allocated_cards'])
+        self.assertEqual(
+            [message['message'] for message in blue_messages],
+            ['opponent_exchanged_cards'])
+        self.assertEqual(aton.bytes_emitted - bytes_emitted, sum(
+            len(notifier.call_args[0][0]) for notifier in notifiers))
+
+    def test_flushes_structured_and_bytes_batches(self):
+        notifiers = [Mock(), Mock()]
+        aton = AtonCore(notifiers, seed=1)
+        aton.red.message_format = MessageFormat.Structured
+        aton.blue.message_format = MessageFormat.Bytes
+        aton.start()
+
+        aton.execute_many([
+            {'player': player.name, 'message': 'allocate_cards',
+             'cards': player.hand}
+            for player in [aton.red, aton.blue]])
+
+        red_messages = notifiers[0].call_args[0][0]
+        blue_messages = json.loads(bytes(notifiers[1].call_args[0][0]))
+        self.assertIsInstance(red_messages, list)
+        self.assertEqual(red_messages[0]['message'],
+                         'opponent_allocated_cards')
+        self.assertEqual(blue_messages[0]['message'],
+                         'opponent_allocated_cards')
+        self.assertEqual(red_messages[1:], blue_messages[1:])
+        self.assertIsNone(aton.red.batch)
+
+    def test_failing_notifier_does_not_hold_back_other_batches(self):
+        notifiers = [Mock(side_effect=OSError), Mock()]
+        aton = AtonCore(notifiers, seed=1)
+        aton.red.notifier = None
+        aton.start()
+        aton.red.notifier = notifiers[0]
+        notifiers[1].reset_mock()
+
+        with self.assertRaises(OSError):
+            aton.execute_many([
+                {'player': 'blue', 'message': 'exchange_cards'},
+                {'player': 'red', 'message': 'exchange_cards'},
+            ])
+
+        self.assertIsNone(aton.red.batch)
+        self.assertIsNone(aton.blue.batch)
+        notifiers[1].assert_called_once()
+        notifiers[1].reset_mock()
+        aton.execute({'player': 'red', 'message': 'allocate_cards',
+                      'cards': aton.red.hand})
+        notifiers[1].assert_called_once()
@@ -0,0 +1,189 @@
+import os
+import tempfile
+import time
+from random import Random
+from threading import Barrier, RLock, Thread
+from unittest import TestCase
+
+from instrumentation import Metrics
+from journal import Journal, JournalReader
+from main import AtonCore, InvalidCommand, MessageFormat, State
+
+GAMES = 16
+THREADS = 16
+
+
+def get_state(aton):
+    return [
+        aton.state, str(aton.current_player),
+        [(player.deck, player.hand, player.cartouches, player.discard,
+          player.points, player.can_exchange_cards)
+         for player in [aton.red, aton.blue]],
+        [list(temple.tokens) for temple in aton.temples],
+    ]
+
+
+def count_messages(messages, name):
+    return sum(message['message'] == name for message in messages)
+
+
+class TestConcurrency(TestCase):
+    def create_games(self, notifier_delay=0, journal=None, metrics=None):
+        games = []
+        for seed in range(GAMES):
+            messages = [[], []]
+
+            def notifier(messages):
+                def notify(message):
+                    messages.append(message)
+                    time.sleep(notifier_delay)
+                return notify
+            aton = AtonCore([notifier(messages[0]), notifier(messages[1])],
+                            seed, MessageFormat.Structured)
+            aton.set_lock()
+            if journal:
+                aton.set_journal(journal.bind(seed))
+            aton.set_metrics(metrics)
+            aton.start()
+            games.append((aton, messages))
+        return games
+
+    def run_threads(self, target, count=THREADS):
+        barrier = Barrier(count)
+        errors = []
+
+        def run(thread_number):
+            barrier.wait()
+            try:
+                target(thread_number)
+            except Exception as error:
+                errors.append(error)
+        threads = [Thread(target=run, args=(thread_number,))
+                   for thread_number in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def allocate(self, aton, player_name):
+        hand = aton.get_view(player_name).message['players'][
+            player_name].get('hand')
+        try:
+            aton.execute({'player': player_name, 'message': 'allocate_cards',
+                          'cards': hand or []})
+        except InvalidCommand:
+            pass
+
+    def check_view(self, aton, player_name):
+        view = aton.get_view(player_name).message
+        player = view['players'][player_name]
+        cards = player.get('hand') or player['cartouches']
+        self.assertEqual(
+            player['cards_left'] + len(player['discard']) + len(cards), 36)
+        if view['state'] != State.Allocating.name:
+            self.assertTrue(view['players']['red']['allocated_cards'])
+            self.assertTrue(view['players']['blue']['allocated_cards'])
+
+    def test_many_threads_do_not_lose_updates(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'events.journal')
+        journal = Journal(path, sync_every=10)
+        metrics = Metrics()
+        games = self.create_games(journal=journal, metrics=metrics)
+        phase_barrier = Barrier(THREADS)
+
+        def hammer(thread_number):
+            random = Random(thread_number)
+            for phase in range(2):
+                phase_barrier.wait()
+                for aton, _ in random.sample(games, len(games)):
+                    for player_name in random.sample(['red', 'blue'], 2):
+                        if phase == 0:
+                            aton.execute({'player': player_name,
+                                          'message': 'exchange_cards'})
+                        else:
+                            self.allocate(aton, player_name)
+                        self.check_view(aton, random.choice(['red', 'blue']))
+        self.run_threads(hammer)
+        journal.close()
+        reader = JournalReader(path)
+        self.addCleanup(reader.close)
+
+        counters = metrics.to_dict()['counters']
+        self.assertEqual(sum(
+            counter['value'] for counter in counters
+            if counter['name'] in ('aton_commands_total',
+                                   'aton_rejected_commands_total')),
+            2 * 2 * GAMES * THREADS)
+        for seed, (aton, messages) in enumerate(games):
+            expected_records = []
+            expected_aton = AtonCore(seed=seed)
+            expected_aton.set_journal(
+                lambda recipient, event: expected_records.append(
+                    (recipient, bytes(event.payload))))
+            expected_aton.start()
+            for player in [expected_aton.red, expected_aton.blue]:
+                expected_aton.execute({
+                    'player': player.name, 'message': 'exchange_cards'})
+            for player in [expected_aton.red, expected_aton.blue]:
+                expected_aton.execute({
+                    'player': player.name, 'message': 'allocate_cards',
+                    'cards': player.hand})
+
+            self.assertEqual(get_state(aton), get_state(expected_aton))
+            self.assertEqual(
+                sorted((recipient, bytes(payload))
+                       for recipient, payload in reader.game_records(seed)),
+                sorted(expected_records))
+            for player_messages in messages:
+                self.assertEqual(count_messages(
+                    player_messages, 'opponent_exchanged_cards'), 1)
+                self.assertEqual(count_messages(
+                    player_messages, 'opponent_allocated_cards'), 1)
+                self.assertEqual(count_messages(
+                    player_messages, 'starting_player_selected'), 1)
+                self.assertEqual(count_messages(
+                    player_messages, 'cards_drawn'), 2)
+
+    def test_throughput_scales_with_games(self):
+        def play(games):
+            def hammer(thread_number):
+                aton, _ = games[thread_number % len(games)]
+                for player_name in ['red', 'blue']:
+                    aton.execute({'player': player_name,
+                                  'message': 'exchange_cards'})
+            start = time.perf_counter()
+            self.run_threads(hammer, len(games))
+            return time.perf_counter() - start
+
+        per_game_locks = play(self.create_games(notifier_delay=0.002))
+        games = self.create_games(notifier_delay=0.002)
+        global_lock = RLock()
+        for aton, _ in games:
+            aton.set_lock(global_lock)
+        single_lock = play(games)
+
+        self.assertLess(per_game_locks * 3, single_lock)
+
+    def test_subscriber_changes_wait_for_the_game_lock(self):
+        aton = AtonCore(seed=1)
+        aton.set_lock()
+        spectator = aton.add_spectator(None)
+        changes = [
+            lambda: aton.add_spectator(None),
+            lambda: aton.remove_spectator(spectator),
+            lambda: aton.set_metrics(Metrics()),
+            lambda: aton.set_journal(None),
+        ]
+
+        for change in changes:
+            with aton.lock:
+                thread = Thread(target=change)
+                thread.start()
+                thread.join(0.05)
+                self.assertTrue(thread.is_alive())
+            thread.join()
+        self.assertEqual(len(aton.spectators), 1)
+        self.assertIsNot(aton.spectators[0], spectator)
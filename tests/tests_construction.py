@@ -0,0 +1,130 @@
+from random import Random
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import Mock
+
+from main import AtonCore, GamePool, Player, Temple, generate_decks
+from server import GameHost
+from snapshot import restore, snapshot
+
+
+def get_state(aton):
+    return [
+        aton.state, aton.finished, str(aton.current_player),
+        [(player.deck, player.hand, player.cartouches, player.discard,
+          player.points, player.can_exchange_cards, player.tokens_left)
+         for player in [aton.red, aton.blue]],
+        [list(temple.tokens) for temple in aton.temples],
+        aton.random.getstate(),
+    ]
+
+
+class TestConstruction(TestCase):
+    def test_does_not_generate_decks_until_started(self):
+        aton = AtonCore(seed=3)
+
+        self.assertFalse(aton.decks_dealt)
+        self.assertEqual(aton.random.getstate(), Random(3).getstate())
+
+        aton.start()
+
+        red_deck, blue_deck = generate_decks(Random(3), 2)
+        self.assertEqual(aton.red.hand + aton.red.deck, red_deck)
+        self.assertEqual(aton.blue.hand + aton.blue.deck, blue_deck)
+
+    def test_reading_a_deck_deals_both_decks(self):
+        aton = AtonCore(seed=3)
+
+        self.assertEqual(aton.blue.deck, generate_decks(Random(3), 2)[1])
+        self.assertTrue(aton.decks_dealt)
+
+    def test_keeps_decks_set_before_start(self):
+        aton = AtonCore(seed=3)
+        aton.red.deck = [1, 1, 1, 1, 2]
+
+        aton.start()
+
+        self.assertEqual(aton.red.hand, [1, 1, 1, 1])
+        self.assertEqual(aton.red.deck, [2])
+        self.assertEqual(aton.blue.hand, generate_decks(Random(3), 2)[1][:4])
+
+    def test_player_without_game_generates_own_deck(self):
+        player = Player('red', random=Random(4))
+
+        player.draw_cards()
+
+        self.assertEqual(player.hand, generate_decks(Random(4))[0][:4])
+
+    def test_clone_and_snapshot_of_game_before_start(self):
+        aton = AtonCore(seed=5)
+        clone = aton.clone()
+        restored = restore(snapshot(aton))
+
+        for game in [aton, clone, restored]:
+            game.start()
+
+        self.assertEqual(get_state(clone), get_state(aton))
+        self.assertEqual(get_state(restored), get_state(aton))
+
+    def test_uses_slots(self):
+        for instance in [AtonCore(), Player('red'), Temple()]:
+            self.assertFalse(hasattr(instance, '__dict__'))
+
+    def test_reset_game_matches_new_game(self):
+        notifiers = [Mock(), Mock()]
+        aton = AtonCore(seed=1)
+        aton.start()
+        aton.execute({'player': 'red', 'message': 'exchange_cards'})
+        aton.temples[0].tokens[0] = 'red'
+        aton.add_spectator(Mock())
+
+        aton.reset(notifiers, seed=6)
+        aton.start()
+
+        new_aton = AtonCore(seed=6)
+        new_aton.start()
+        self.assertEqual(get_state(aton), get_state(new_aton))
+        self.assertEqual(aton.spectators, [])
+        notifiers[0].assert_called_once()
+
+
+class TestGamePool(TestCase):
+    def test_recycles_released_games(self):
+        pool = GamePool(size=1)
+        aton = pool.acquire(seed=1)
+        other_aton = pool.acquire(seed=2)
+        aton.start()
+
+        pool.release(aton)
+        pool.release(other_aton)
+
+        self.assertEqual(pool.games, [aton])
+        self.assertIs(pool.acquire(seed=7), aton)
+        self.assertEqual(aton.seed, 7)
+        self.assertFalse(aton.decks_dealt)
+        self.assertIsNot(pool.acquire(seed=7), aton)
+
+    def test_released_games_drop_subscribers(self):
+        pool = GamePool()
+        aton = pool.acquire([Mock(), Mock()])
+        aton.add_spectator(Mock())
+        aton.set_journal(Mock())
+
+        pool.release(aton)
+
+        self.assertIsNone(aton.red.notifier)
+        self.assertIsNone(aton.blue.notifier)
+        self.assertIsNone(aton.red.journal)
+        self.assertEqual(aton.spectators, [])
+
+
+class TestGameHostPool(IsolatedAsyncioTestCase):
+    async def test_reuses_closed_games(self):
+        host = GameHost(pool=GamePool())
+        game = host.create_game('a', seed=1)
+        await host.start_game('a')
+
+        host.close_game('a')
+        other_game = host.create_game('b', seed=1)
+
+        self.assertIs(other_game.aton, game.aton)
+        self.assertFalse(other_game.aton.decks_dealt)
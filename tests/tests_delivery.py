@@ -0,0 +1,124 @@
+import asyncio
+import threading
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from delivery import (
+    AsyncQueuedNotifier, DeliveryQueueFull, Overflow, QueuedNotifier,
+    queue_notifications)
+from main import AtonCore, MessageFormat
+
+
+class BlockedNotifier:
+    def __init__(self):
+        self.messages = []
+        self.started = threading.Event()
+        self.released = threading.Event()
+
+    def __call__(self, message):
+        self.started.set()
+        self.released.wait(5)
+        self.messages.append(message)
+
+
+class TestQueuedNotifier(TestCase):
+    def play(self, aton):
+        aton.start()
+        aton.execute({'player': 'blue', 'message': 'exchange_cards'})
+        for player in [aton.red, aton.blue]:
+            aton.execute({
+                'player': player.name,
+                'message': 'allocate_cards',
+                'cards': player.hand,
+            })
+
+    def test_engine_does_not_wait_for_slow_notifier(self):
+        expected_messages = []
+        self.play(AtonCore([expected_messages.append, None], seed=0,
+                           message_format=MessageFormat.Structured))
+        notifier = BlockedNotifier()
+        aton = AtonCore([notifier, None], seed=0,
+                        message_format=MessageFormat.Structured)
+        queued_notifier, = queue_notifications(aton)
+
+        self.play(aton)
+        self.assertTrue(notifier.started.wait(5))
+        self.assertEqual(notifier.messages, [])
+
+        notifier.released.set()
+        queued_notifier.flush()
+        queued_notifier.close()
+
+        self.assertEqual(notifier.messages, expected_messages)
+
+    def fill(self, overflow):
+        notifier = BlockedNotifier()
+        queued_notifier = QueuedNotifier(notifier, maxsize=2,
+                                         overflow=overflow)
+        queued_notifier(0)
+        self.assertTrue(notifier.started.wait(5))
+        queued_notifier(1)
+        queued_notifier(2)
+        return notifier, queued_notifier
+
+    def drain(self, notifier, queued_notifier):
+        notifier.released.set()
+        queued_notifier.flush()
+        queued_notifier.close()
+        return notifier.messages
+
+    def test_drops_oldest_messages(self):
+        notifier, queued_notifier = self.fill(Overflow.DropOldest)
+
+        queued_notifier(3)
+
+        self.assertEqual(self.drain(notifier, queued_notifier), [0, 2, 3])
+        self.assertEqual(queued_notifier.dropped, 1)
+
+    def test_drops_newest_messages(self):
+        notifier, queued_notifier = self.fill(Overflow.DropNewest)
+
+        queued_notifier(3)
+
+        self.assertEqual(self.drain(notifier, queued_notifier), [0, 1, 2])
+        self.assertEqual(queued_notifier.dropped, 1)
+
+    def test_raises_when_full(self):
+        notifier, queued_notifier = self.fill(Overflow.Raise)
+
+        with self.assertRaises(DeliveryQueueFull):
+            queued_notifier(3)
+
+        self.assertEqual(self.drain(notifier, queued_notifier), [0, 1, 2])
+
+    def test_counts_failing_notifier_calls(self):
+        def notifier(message):
+            raise ConnectionError()
+        queued_notifier = QueuedNotifier(notifier)
+
+        queued_notifier('message')
+        queued_notifier.flush()
+        queued_notifier.close()
+
+        self.assertEqual(queued_notifier.failures, 1)
+
+
+class TestAsyncQueuedNotifier(IsolatedAsyncioTestCase):
+    async def test_delivers_messages_in_order(self):
+        messages = []
+
+        async def notifier(message):
+            await asyncio.sleep(0)
+            messages.append(message)
+        queued_notifier = AsyncQueuedNotifier(notifier, maxsize=2)
+
+        for message in range(4):
+            queued_notifier(message)
+        await queued_notifier.flush()
+        await queued_notifier.close()
+
+        self.assertEqual(messages, [2, 3])
+        self.assertEqual(queued_notifier.dropped, 2)
+
+    async def test_rejects_blocking_overflow(self):
+        with self.assertRaises(ValueError):
+            AsyncQueuedNotifier(print, overflow=Overflow.Block)
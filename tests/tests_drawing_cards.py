@@ -97,3 +97,12 @@ class TestDrawingCards(TestCase):
         notifier.assert_called_with(json.dumps({
             'message': 'opponent_exchanged_cards',
         }))
+
+    def test_counts_cards_left_in_deck(self):
+        aton = AtonCore()
+        aton.red.deck = [1, 2, 3, 4, 4, 3]
+
+        aton.start()
+
+        self.assertEqual(aton.red.cards_left, 2)
+        self.assertEqual(aton.red.deck, [4, 3])
@@ -0,0 +1,112 @@
+import pstats
+from itertools import count
+from unittest import TestCase
+
+from instrumentation import Metrics
+from main import AtonCore, InvalidCommand
+
+
+class TestInstrumentation(TestCase):
+    def setUp(self):
+        ticks = count()
+        self.metrics = Metrics(slow_notifier_threshold=1.5,
+                               clock=lambda: next(ticks))
+        self.messages = []
+        self.aton = AtonCore([self.messages.append, None], seed=0)
+        self.aton.set_metrics(self.metrics)
+
+    def play(self):
+        self.aton.start()
+        self.aton.execute({'player': 'red', 'message': 'exchange_cards'})
+        for player in [self.aton.red, self.aton.blue]:
+            self.aton.execute({
+                'player': player.name,
+                'message': 'allocate_cards',
+                'cards': player.hand,
+            })
+
+    def get_counter(self, name, **labels):
+        return self.metrics.counters.get(
+            (name, tuple(sorted(labels.items()))), 0)
+
+    def get_histogram(self, name, **labels):
+        return self.metrics.histograms[
+            (name, tuple(sorted(labels.items())))]
+
+    def test_records_commands_and_transitions(self):
+        self.play()
+
+        self.assertEqual(self.get_counter(
+            'aton_commands_total', message='allocate_cards'), 2)
+        self.assertEqual(self.get_counter(
+            'aton_commands_total', message='exchange_cards'), 1)
+        for state in ['Allocating', 'Scoring', 'OrderOfPlay',
+                      'RemovingTokens']:
+            self.assertEqual(self.get_counter(
+                'aton_state_transitions_total', state=state), 1)
+        self.assertEqual(self.get_histogram(
+            'aton_command_seconds', message='allocate_cards').count, 2)
+
+    def test_records_notifier_calls(self):
+        self.play()
+
+        histogram = self.get_histogram('aton_notifier_seconds')
+        self.assertEqual(histogram.count, len(self.messages))
+        self.assertEqual(self.get_counter('aton_slow_notifier_calls_total'),
+                         0)
+
+        self.metrics.slow_notifier_threshold = 0.5
+        self.aton.red.deliver({'message': 'test'})
+        self.assertEqual(self.get_counter('aton_slow_notifier_calls_total'),
+                         1)
+
+    def test_records_rejected_commands_and_reshuffles(self):
+        self.aton.red.deck = [1, 2]
+        self.aton.red.discard = [3, 3, 3]
+        self.aton.start()
+
+        with self.assertRaises(InvalidCommand):
+            self.aton.execute({'player': 'red', 'message': 'unknown'})
+
+        self.assertEqual(self.get_counter(
+            'aton_rejected_commands_total', state='Allocating'), 1)
+        self.assertEqual(self.get_counter(
+            'aton_reshuffles_total', player='red'), 1)
+
+    def test_exports_metrics(self):
+        self.play()
+
+        exported = self.metrics.to_dict()
+        self.assertIn({
+            'name': 'aton_commands_total',
+            'labels': {'message': 'exchange_cards'},
+            'value': 1,
+        }, exported['counters'])
+        text = self.metrics.to_prometheus()
+        self.assertIn('# TYPE aton_commands_total counter\n', text)
+        self.assertIn(
+            'aton_commands_total{message="allocate_cards"} 2\n', text)
+        self.assertIn('# TYPE aton_state_seconds histogram\n', text)
+        self.assertIn(
+            'aton_state_seconds_count{state="Scoring"} 1\n', text)
+        self.assertIn(
+            'aton_command_seconds_bucket{message="allocate_cards",'
+            'le="+Inf"} 2\n', text)
+
+    def test_profiles_single_command(self):
+        self.aton.start()
+
+        with self.metrics.profile() as profiler:
+            self.aton.execute({'player': 'red', 'message': 'exchange_cards'})
+
+        functions = [function for _, _, function in
+                     pstats.Stats(profiler).stats]
+        self.assertIn('draw_cards', functions)
+
+    def test_is_disabled_by_default(self):
+        aton = AtonCore()
+        aton.start()
+
+        self.assertIsNone(aton.metrics)
+        self.assertIsNone(aton.red.metrics)
+        self.assertIsNone(aton.clone().metrics)
@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from journal import Journal, JournalReader
+from main import AtonCore, Event
+
+
+class TestJournal(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'events.journal')
+
+    def play(self, journal, game_id):
+        messages = {'red': [], 'blue': []}
+        aton = AtonCore([messages['red'].append, messages['blue'].append],
+                        seed=game_id)
+        aton.set_journal(journal.bind(game_id))
+        aton.start()
+        aton.execute({'player': 'red', 'message': 'exchange_cards'})
+        for player in [aton.red, aton.blue]:
+            aton.execute({
+                'player': player.name,
+                'message': 'allocate_cards',
+                'cards': player.hand,
+            })
+        return messages
+
+    def test_reads_back_every_event(self):
+        with Journal(self.path) as journal:
+            messages = self.play(journal, 7)
+
+        with JournalReader(self.path) as reader:
+            records = [(game_id, recipient, json.loads(bytes(payload)))
+                       for game_id, recipient, payload in reader]
+
+        self.assertEqual({record[0] for record in records}, {7})
+        for player_name in ['red', 'blue']:
+            self.assertEqual(
+                [json.dumps(message) for _, recipient, message in records
+                 if recipient in ('', player_name)],
+                messages[player_name])
+        self.assertIn('starting_player_selected', [
+            message['message'] for _, recipient, message in records
+            if recipient == ''])
+
+    def test_seeks_by_game_id(self):
+        with Journal(self.path) as journal:
+            self.play(journal, 1)
+            messages = self.play(journal, 2)
+            self.play(journal, 3)
+
+        with JournalReader(self.path) as reader:
+            records = [bytes(payload).decode()
+                       for _, payload in reader.game_records(2, 'blue')]
+            self.assertEqual(sorted(reader.build_index()), [1, 2, 3])
+
+        self.assertEqual(records, messages['blue'])
+
+    def test_batches_fsync_calls(self):
+        with patch('journal.os.fsync') as fsync:
+            with Journal(self.path, sync_every=5,
+                         sync_interval=3600) as journal:
+                for _ in range(12):
+                    journal.append(1, 'red', b'{}')
+                self.assertEqual(fsync.call_count, 2)
+            self.assertEqual(fsync.call_count, 3)
+
+    def test_ignores_truncated_record(self):
+        with Journal(self.path) as journal:
+            journal.append(1, 'red', b'{"message": "a"}')
+            journal.append(1, 'red', b'{"message": "b"}')
+        with open(self.path, 'r+b') as journal_file:
+            journal_file.truncate(os.path.getsize(self.path) - 3)
+
+        with JournalReader(self.path) as reader:
+            payloads = [bytes(payload) for _, _, payload in reader]
+
+        self.assertEqual(payloads, [b'{"message": "a"}'])
+
+    def test_reads_empty_journal(self):
+        Journal(self.path).close()
+
+        with JournalReader(self.path) as reader:
+            self.assertEqual(list(reader), [])
+
+    def test_closes_while_payloads_are_referenced(self):
+        with Journal(self.path) as journal:
+            journal.append(1, 'red', b'{"message": "a"}')
+            journal.append(2, 'blue', b'{"message": "b"}')
+
+        with JournalReader(self.path) as reader:
+            records = list(reader)
+            _, payload = next(reader.game_records(2))
+
+        self.assertEqual(bytes(records[0][2]), b'{"message": "a"}')
+        self.assertEqual(bytes(payload), b'{"message": "b"}')
+
+    def test_accepts_string_and_bytes_game_ids(self):
+        game_ids = ['0f8fad5b-d9cb-469f-a165-70867728950e', b'\x00\xff', 3]
+        with Journal(self.path) as journal:
+            for game_id in game_ids:
+                journal.bind(game_id)('red', Event({'message': 'a'}))
+
+        with JournalReader(self.path) as reader:
+            self.assertEqual([game_id for game_id, _, _ in reader], game_ids)
+            _, payload = next(reader.game_records(game_ids[0]))
+            self.assertEqual(json.loads(bytes(payload)), {'message': 'a'})
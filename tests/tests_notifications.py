@@ -0,0 +1,124 @@
+import json
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from main import AtonCore, Event, MessageFormat, State
+
+
+class TestNotifications(TestCase):
+    def test_structured_notifiers_receive_dicts(self):
+        notifiers = [Mock(), Mock()]
+        aton = AtonCore(notifiers, message_format=MessageFormat.Structured)
+        aton.red.deck = [1, 2, 3, 4]
+
+        aton.start()
+
+        notifiers[0].assert_called_with({
+            'message': 'cards_drawn',
+            'cards': [1, 2, 3, 4],
+        })
+
+    def test_mixes_message_formats(self):
+        notifiers = [Mock(), Mock()]
+        aton = AtonCore(notifiers)
+        aton.blue.message_format = MessageFormat.Structured
+
+        aton.start()
+        aton.execute({'player': 'red', 'message': 'exchange_cards'})
+
+        notifiers[1].assert_called_with({
+            'message': 'opponent_exchanged_cards',
+        })
+        notifiers[0].assert_called_with(json.dumps({
+            'message': 'cards_drawn',
+            'cards': aton.red.hand,
+        }))
+
+    def test_encodes_broadcast_once(self):
+        notifiers = [Mock(), Mock()]
+        aton = AtonCore(notifiers)
+        aton.red.cartouches = [3, 1, 1, 1]
+        aton.blue.cartouches = [1, 1, 1, 1]
+        aton.state = State.Scoring
+
+        with patch('main.json.dumps', wraps=json.dumps) as dumps:
+            aton.start()
+
+        self.assertEqual(dumps.call_count, 3)
+        self.assertIs(notifiers[0].call_args_list[0][0][0],
+                      notifiers[1].call_args_list[0][0][0])
+
+    def test_skips_encoding_for_structured_notifiers(self):
+        aton = AtonCore([Mock(), Mock()],
+                        message_format=MessageFormat.Structured)
+
+        with patch('main.json.dumps') as dumps:
+            aton.start()
+
+        dumps.assert_not_called()
+
+    def test_event_encodes_lazily(self):
+        event = Event({'message': 'opponent_allocated_cards'})
+
+        self.assertIsNone(event._json)
+        self.assertEqual(event.render(MessageFormat.Json),
+                         '{"message": "opponent_allocated_cards"}')
+        self.assertIs(event.render(MessageFormat.Json), event.json)
+
+    def test_bytes_notifiers_share_one_payload(self):
+        notifiers = [Mock(), Mock()]
+        aton = AtonCore(notifiers, message_format=MessageFormat.Bytes)
+        spectator_notifier = Mock()
+        aton.add_spectator(spectator_notifier, MessageFormat.Bytes)
+        aton.red.cartouches = [1, 1, 1, 1]
+        aton.blue.cartouches = [1, 2, 1, 1]
+        aton.state = State.OrderOfPlay
+
+        aton.start()
+
+        payload = notifiers[0].call_args_list[0][0][0]
+        self.assertIsInstance(payload, memoryview)
+        self.assertIs(notifiers[1].call_args_list[0][0][0], payload)
+        self.assertIs(spectator_notifier.call_args_list[0][0][0], payload)
+        self.assertEqual(json.loads(bytes(payload)), {
+            'message': 'starting_player_selected',
+            'player': 'red',
+            'cards_used': {'red': [], 'blue': []},
+        })
+
+    def test_spectators_receive_only_broadcasts(self):
+        spectator_notifier = Mock()
+        aton = AtonCore()
+        spectator = aton.add_spectator(spectator_notifier)
+
+        aton.start()
+        spectator_notifier.assert_not_called()
+
+        aton.red.cartouches = [3, 1, 1, 1]
+        aton.blue.cartouches = [1, 1, 1, 1]
+        aton.state = State.Scoring
+        aton.start()
+        spectator_notifier.assert_any_call(json.dumps({
+            'message': 'points_scored',
+            'player': 'red',
+            'points': 4,
+        }))
+
+        aton.remove_spectator(spectator)
+        self.assertEqual(aton.spectators, [])
+
+    def test_counts_emitted_bytes(self):
+        messages = []
+        aton = AtonCore([messages.append, None])
+        aton.add_spectator(messages.append, MessageFormat.Bytes)
+        aton.add_spectator(messages.append, MessageFormat.Structured)
+        aton.red.cartouches = [3, 1, 1, 1]
+        aton.blue.cartouches = [1, 1, 1, 1]
+        aton.state = State.Scoring
+
+        aton.start()
+
+        wire_messages = [m for m in messages if not isinstance(m, dict)]
+        self.assertEqual(aton.bytes_emitted, sum(map(len, wire_messages)))
+        self.assertEqual(aton.red.bytes_sent * 2, aton.bytes_emitted)
+        self.assertEqual(aton.blue.bytes_sent, 0)
@@ -1,8 +1,9 @@
 import json
+from random import Random
 from unittest import TestCase
 from unittest.mock import Mock, patch
 
-from main import AtonCore, State
+from main import AtonCore, Player, State, break_tie
 
 
 class TestOrderOfPlay(TestCase):
@@ -67,7 +68,7 @@ class TestOrderOfPlay(TestCase):
         self.assertEqual(self.aton.blue.deck, [4])
         self.assertEqual(self.aton.blue.discard, [1, 2])
 
-    @patch('main.shuffle')
+    @patch('random.Random.shuffle')
     def test_selects_starting_player_using_shuffled_discards(self, mock):
         red = self.aton.red
         blue = self.aton.blue
@@ -96,3 +97,48 @@ class TestOrderOfPlay(TestCase):
 
         self.assertEqual(blue.deck, [2])
         self.assertEqual(blue.discard, [1, 2])
+
+
+def break_tie_card_by_card(red, blue):
+    red_cards = []
+    blue_cards = []
+    while True:
+        red_card = red.draw_card_and_discard_it()
+        blue_card = blue.draw_card_and_discard_it()
+        red_cards.append(red_card)
+        blue_cards.append(blue_card)
+        if red_card != blue_card:
+            return red_cards, blue_cards
+
+
+class TestTieBreak(TestCase):
+    def create_players(self, seed):
+        random = Random(seed)
+        players = []
+        for _ in range(2):
+            cards = random.choice([[1], [1, 2], [1, 2, 3, 4]])
+            deck = random.choices(cards, k=random.randrange(8))
+            player = Player(random=random, deck=deck)
+            player.discard = random.choices(
+                cards, k=random.randrange(1, 8) + (not deck))
+            players.append(player)
+        players[1].discard.append(2)
+        players[0].name = 'red'
+        players[1].name = 'blue'
+        return players
+
+    def get_state(self, players):
+        return [(player.deck, player.discard, player.random.getstate())
+                for player in players]
+
+    def test_matches_card_by_card_tie_break(self):
+        for seed in range(2000):
+            players = self.create_players(seed)
+            expected_players = self.create_players(seed)
+
+            cards_used = break_tie(*players)
+
+            self.assertEqual(cards_used,
+                             break_tie_card_by_card(*expected_players))
+            self.assertEqual(self.get_state(players),
+                             self.get_state(expected_players))
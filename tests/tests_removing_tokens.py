@@ -163,3 +163,59 @@ class TestRemovingTokens(TestCase):
         for token in temple.tokens:
             self.assertNotEqual(token, 'red', 'Temple {}: {}'.format(
                 0, temple.tokens))
+
+    def prepare_removal(self, notifiers):
+        aton = AtonCore(notifiers)
+        aton.red.cartouches = [1, 4, 3, 4]
+        for i in range(4):
+            aton.temples[i].tokens[0] = 'blue'
+            aton.temples[i].tokens[1] = 'blue'
+        aton.current_player = aton.red
+        aton.state = State.RemovingTokens
+        aton.start()
+        return aton
+
+    def test_removes_tokens_chosen_by_player(self):
+        notifiers = [Mock(), Mock()]
+        aton = self.prepare_removal(notifiers)
+
+        aton.execute(json.dumps({
+            'player': 'red',
+            'message': 'remove_tokens',
+            'removed_tokens': [[0], [], [1], []],
+        }))
+
+        for notifier in notifiers:
+            notifier.assert_called_with(json.dumps({
+                'message': 'tokens_removed',
+                'removing_player': 'red',
+                'token_owner': 'blue',
+                'removed_tokens': [[0], [], [1], []],
+            }))
+        self.assertEqual(aton.temples[0].tokens[:2], ['', 'blue'])
+        self.assertEqual(aton.temples[2].tokens[:2], ['blue', ''])
+        self.assertIsNone(aton.pending_removal)
+
+    def test_validates_removed_tokens(self):
+        notifiers = [Mock(), Mock()]
+        aton = self.prepare_removal(notifiers)
+
+        for removed_tokens in [
+                [[0], [], [], []],
+                [[0, 0], [], [], []],
+                [[0], [], [], [1]],
+                [[0], [5], [], []]]:
+            aton.execute(json.dumps({
+                'player': 'red',
+                'message': 'remove_tokens',
+                'removed_tokens': removed_tokens,
+            }))
+        aton.execute(json.dumps({
+            'player': 'blue',
+            'message': 'remove_tokens',
+            'removed_tokens': [[0], [1], [], []],
+        }))
+
+        for temple in aton.temples:
+            self.assertEqual(temple.tokens[:2], ['blue', 'blue'])
+        self.assertIsNotNone(aton.pending_removal)
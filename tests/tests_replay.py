@@ -0,0 +1,105 @@
+import io
+import json
+from unittest import TestCase
+
+from main import AtonCore
+from replay import CommandLog, replay
+
+
+class TestReplay(TestCase):
+    def write_log(self, games=6, finished_games=None):
+        if finished_games is None:
+            finished_games = games
+        log_file = io.StringIO()
+        log = CommandLog(log_file)
+        atons = [AtonCore(seed=game_id) for game_id in range(games)]
+        for game_id, aton in enumerate(atons):
+            log.start(game_id, aton)
+        for game_id, aton in enumerate(atons):
+            if game_id % 2:
+                log.execute(game_id, aton, {
+                    'player': 'blue',
+                    'message': 'exchange_cards',
+                })
+        for player_name in ['red', 'blue']:
+            for game_id, aton in enumerate(atons):
+                log.execute(game_id, aton, {
+                    'player': player_name,
+                    'message': 'allocate_cards',
+                    'cards': aton.get_player_by_name(player_name).hand,
+                })
+        for game_id, aton in enumerate(atons[:finished_games]):
+            log.finish(game_id, aton)
+        return log_file.getvalue().splitlines()
+
+    def test_replays_interleaved_games(self):
+        results = list(replay(self.write_log()))
+
+        self.assertEqual([result.game_id for result in results],
+                         list(range(6)))
+        for result in results:
+            self.assertTrue(result.verified)
+            self.assertTrue(result.matches)
+            self.assertEqual(result.actual['state'], 'RemovingTokens')
+
+    def test_detects_mismatching_games(self):
+        lines = self.write_log()
+        finish = json.loads(lines[-1])
+        finish['points']['red'] += 1
+        lines[-1] = json.dumps(finish)
+
+        results = list(replay(lines))
+
+        self.assertEqual(
+            [result.game_id for result in results if not result.matches],
+            [5])
+
+    def test_replays_unfinished_games_without_verification(self):
+        results = list(replay(self.write_log(finished_games=4)))
+
+        self.assertEqual([result.verified for result in results],
+                         [True] * 4 + [False] * 2)
+
+    def test_process_pool_gives_same_results(self):
+        lines = self.write_log()
+
+        single = [result.actual for result in replay(lines)]
+        pooled = [result.actual
+                  for result in replay(lines, processes=2, batch_size=4)]
+
+        self.assertEqual(single, pooled)
+
+    def test_skips_games_without_start_records(self):
+        lines = self.write_log()[3:]
+        lines.insert(0, json.dumps({
+            'game': 'archived',
+            'player': 'red',
+            'message': 'exchange_cards',
+        }))
+        unstarted_games = set()
+
+        results = list(replay(lines, unstarted_games=unstarted_games))
+
+        self.assertEqual([result.game_id for result in results], [3, 4, 5])
+        self.assertEqual(unstarted_games, {0, 1, 2, 'archived'})
+
+    def test_reports_archives_without_game_ids_as_unstarted(self):
+        lines = [json.dumps({'player': 'red', 'message': 'exchange_cards'})]
+        unstarted_games = set()
+
+        results = list(replay(lines, unstarted_games=unstarted_games))
+
+        self.assertEqual(results, [])
+        self.assertEqual(unstarted_games, {None})
+
+    def test_skips_malformed_commands(self):
+        lines = self.write_log()
+        lines.insert(6, json.dumps({
+            'game': 0,
+            'player': 'red',
+            'message': 'allocate_cards',
+        }))
+
+        results = list(replay(lines))
+
+        self.assertTrue(all(result.matches for result in results))
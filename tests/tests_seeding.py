@@ -0,0 +1,56 @@
+import json
+from random import Random
+from unittest import TestCase
+
+from main import AtonCore, DECK_SIZE, generate_decks
+
+
+class TestSeeding(TestCase):
+    def play(self, seed):
+        messages = []
+        aton = AtonCore([messages.append, messages.append], seed)
+        aton.start()
+        for _ in range(2):
+            for player in ['red', 'blue']:
+                aton.execute(json.dumps({
+                    'player': player,
+                    'message': 'exchange_cards',
+                }))
+        for player in [aton.red, aton.blue]:
+            aton.execute(json.dumps({
+                'player': player.name,
+                'message': 'allocate_cards',
+                'cards': player.hand,
+            }))
+        return messages, aton.red.deck, aton.blue.deck
+
+    def test_same_seed_gives_same_game(self):
+        self.assertEqual(self.play(42), self.play(42))
+
+    def test_different_seeds_give_different_decks(self):
+        self.assertNotEqual(AtonCore(seed=1).red.deck,
+                            AtonCore(seed=2).red.deck)
+
+    def test_stores_generated_seed(self):
+        aton = AtonCore()
+
+        self.assertEqual(AtonCore(seed=aton.seed).red.deck, aton.red.deck)
+
+    def test_reshuffles_with_game_random(self):
+        decks = []
+        for _ in range(2):
+            aton = AtonCore(seed=5)
+            aton.red.deck = [1]
+            aton.red.discard = list(range(20))
+            aton.start()
+            decks.append(aton.red.deck)
+
+        self.assertEqual(decks[0], decks[1])
+
+    def test_generates_decks_in_one_draw(self):
+        decks = generate_decks(Random(0), 3)
+
+        self.assertEqual(len(decks), 3)
+        for deck in decks:
+            self.assertEqual(len(deck), DECK_SIZE)
+            self.assertTrue(set(deck).issubset({1, 2, 3, 4}))
@@ -0,0 +1,106 @@
+import asyncio
+import json
+from unittest import IsolatedAsyncioTestCase
+
+from main import GamePool, State
+from server import GameHost
+
+
+class TestGameHost(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.now = 0
+        self.host = GameHost(queue_size=2, idle_timeout=10,
+                             clock=lambda: self.now)
+
+    async def test_routes_commands_to_games(self):
+        game = self.host.create_game('a', seed=1)
+        self.host.create_game('b', seed=1)
+        red = self.host.connect('a', 'red')
+        blue = self.host.connect('a', 'blue')
+
+        await self.host.start_game('a')
+        await self.host.route(json.dumps({
+            'game': 'a',
+            'player': 'red',
+            'message': 'exchange_cards',
+        }))
+
+        self.assertEqual(json.loads(await red.receive())['message'],
+                         'cards_drawn')
+        self.assertEqual(json.loads(await blue.receive())['message'],
+                         'cards_drawn')
+        self.assertEqual(json.loads(await blue.receive())['message'],
+                         'opponent_exchanged_cards')
+        self.assertFalse(game.aton.red.can_exchange_cards)
+        self.assertTrue(self.host.games['b'].aton.red.can_exchange_cards)
+
+    async def test_applies_backpressure(self):
+        game = self.host.create_game('a')
+        spectator = self.host.connect('a')
+        aton = game.aton
+        aton.red.cartouches = [3, 1, 1, 1]
+        aton.blue.cartouches = [1, 1, 1, 1]
+        aton.state = State.Scoring
+
+        task = asyncio.create_task(self.host.start_game('a'))
+        await asyncio.sleep(0)
+        self.assertFalse(task.done())
+        self.assertEqual(spectator.queue.qsize(), 2)
+
+        messages = [json.loads(await spectator.receive()) for _ in range(3)]
+        await task
+
+        self.assertEqual([message['message'] for message in messages], [
+            'points_scored', 'starting_player_selected', 'tokens_removed'])
+
+    async def test_expires_idle_games(self):
+        self.host.create_game('a')
+        connection = self.host.connect('a', 'red')
+        self.now = 5
+        self.host.create_game('b')
+
+        self.now = 12
+        self.assertEqual(self.host.expire_idle_games(), ['a'])
+
+        self.assertEqual(list(self.host.games), ['b'])
+        self.assertEqual([message async for message in connection], [])
+
+    async def test_disconnecting_a_full_connection_releases_the_game(self):
+        host = GameHost(queue_size=1)
+        game = host.create_game('a', seed=1)
+        red = host.connect('a', 'red')
+        await host.start_game('a')
+
+        task = asyncio.create_task(host.execute(
+            'a', {'player': 'red', 'message': 'exchange_cards'}))
+        await asyncio.sleep(0)
+        self.assertFalse(task.done())
+        host.disconnect(red)
+        await asyncio.wait_for(task, 1)
+
+        self.assertFalse(game.lock.locked())
+        self.assertFalse(game.aton.red.can_exchange_cards)
+        self.assertEqual(len([message async for message in red]), 1)
+
+    async def test_closed_games_are_not_recycled_while_running(self):
+        host = GameHost(queue_size=1, pool=GamePool())
+        game = host.create_game('a', seed=1)
+        host.connect('a', 'red')
+        await host.start_game('a')
+        running = asyncio.create_task(host.execute(
+            'a', {'player': 'blue', 'message': 'exchange_cards'}))
+        waiting = asyncio.create_task(host.execute(
+            'a', {'player': 'red', 'message': 'exchange_cards'}))
+        await asyncio.sleep(0)
+        self.assertTrue(game.lock.locked())
+
+        host.close_game('a')
+        await running
+        with self.assertRaises(KeyError):
+            await waiting
+        await asyncio.gather(*host.releases)
+        new_game = host.create_game('b', seed=2)
+
+        self.assertIs(new_game.aton, game.aton)
+        self.assertTrue(new_game.aton.red.can_exchange_cards)
+        self.assertFalse(game.lock.locked())
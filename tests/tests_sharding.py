@@ -0,0 +1,224 @@
+import json
+from multiprocessing import Pipe
+from threading import Thread
+from unittest import TestCase
+from unittest.mock import patch
+
+from main import AtonCore, InvalidCommand, MessageFormat
+from sharding import (
+    ShardError, ShardRouter, ShardWorker, get_shard, run_worker)
+
+
+def get_allocation(game_id, messages, player_name):
+    hands = [message['cards'] for recipient_game_id, recipient, message
+             in messages if recipient_game_id == game_id and
+             recipient == player_name and message['message'] == 'cards_drawn']
+    return {
+        'player': player_name,
+        'message': 'allocate_cards',
+        'cards': hands[-1],
+    }
+
+
+class TestShardWorker(TestCase):
+    def test_runs_games_and_collects_notifications(self):
+        worker = ShardWorker(MessageFormat.Structured)
+
+        results, notifications = worker.handle([
+            ('create_game', 'a', [1]),
+            ('start_game', 'a', []),
+            ('execute', 'b', [{'player': 'red'}]),
+            ('execute', 'a', [{'player': 'red', 'message': 'unknown'}]),
+        ])
+
+        aton = AtonCore(seed=1)
+        aton.start()
+        self.assertEqual(results[:2], [None, None])
+        self.assertIsInstance(results[2], KeyError)
+        self.assertIsInstance(results[3], InvalidCommand)
+        self.assertEqual(notifications, [
+            ('a', 'red', {'message': 'cards_drawn', 'cards': aton.red.hand}),
+            ('a', 'blue',
+             {'message': 'cards_drawn', 'cards': aton.blue.hand}),
+        ])
+
+    def test_moves_games_between_workers(self):
+        worker = ShardWorker(MessageFormat.Structured)
+        other_worker = ShardWorker(MessageFormat.Structured)
+        _, messages = worker.handle([
+            ('create_game', 'a', [1]), ('start_game', 'a', [])])
+
+        (data,), _ = worker.handle([('export_game', 'a', [])])
+        other_worker.handle([('import_game', 'a', [data])])
+        _, notifications = other_worker.handle([
+            ('execute', 'a', [get_allocation('a', messages, 'red')])])
+
+        self.assertEqual(worker.games, {})
+        self.assertEqual(other_worker.games['a'].red.cartouches,
+                         messages[0][2]['cards'])
+        self.assertEqual(notifications, [
+            ('a', 'blue', {'message': 'opponent_allocated_cards'})])
+
+    def test_keeps_game_when_export_fails(self):
+        worker = ShardWorker(MessageFormat.Structured)
+        worker.handle([('create_game', 'a', [1])])
+
+        with patch('sharding.snapshot', side_effect=RuntimeError):
+            (result,), _ = worker.handle([('export_game', 'a', [])])
+
+        self.assertIsInstance(result, RuntimeError)
+        self.assertIn('a', worker.games)
+
+    def test_survives_results_that_cannot_be_sent(self):
+        connection, worker_connection = Pipe()
+        thread = Thread(target=run_worker,
+                        args=(worker_connection, MessageFormat.Structured))
+        thread.start()
+        operations = dict(ShardWorker.operations,
+                          unpicklable=lambda worker, game_id: lambda: None)
+
+        with patch.object(ShardWorker, 'operations', operations):
+            connection.send([('unpicklable', 'a', [])])
+            (result,), _ = connection.recv()
+            connection.send([('create_game', 'a', [1])])
+            results, _ = connection.recv()
+        connection.send(None)
+        thread.join()
+
+        self.assertIsInstance(result, ShardError)
+        self.assertEqual(results, [None])
+
+
+class TestShardRouter(TestCase):
+    def setUp(self):
+        self.now = 0
+        self.messages = []
+        self.router = ShardRouter(
+            workers=2, message_format=MessageFormat.Structured,
+            notifier=lambda *message: self.messages.append(message),
+            idle_timeout=10, clock=lambda: self.now)
+        self.addCleanup(self.router.close)
+
+    def test_routes_games_to_shards_by_id(self):
+        game_ids = ['game-{}'.format(i) for i in range(8)]
+
+        self.router.run([('create_game', game_id, i)
+                         for i, game_id in enumerate(game_ids)])
+        self.router.run([('start_game', game_id) for game_id in game_ids])
+
+        for i, game_id in enumerate(game_ids):
+            aton = AtonCore(seed=i)
+            aton.start()
+            self.assertEqual(self.router.placements[game_id],
+                             get_shard(game_id, 2))
+            self.assertEqual(
+                get_allocation(game_id, self.messages, 'red')['cards'],
+                aton.red.hand)
+        self.assertEqual(sum(self.router.get_loads()), 8)
+
+    def test_raises_command_errors(self):
+        self.router.create_game('a', 1)
+
+        with self.assertRaises(InvalidCommand):
+            self.router.execute('a', {'player': 'red', 'message': 'unknown'})
+
+    def test_rebalances_idle_games(self):
+        game_ids = [game_id for game_id in map(str, range(20))
+                    if get_shard(game_id, 2) == 0][:4]
+        for game_id in game_ids:
+            self.router.create_game(game_id, 1)
+            self.router.start_game(game_id)
+        self.now = 5
+        self.router.execute(game_ids[0], {
+            'player': 'red', 'message': 'exchange_cards'})
+        self.now = 12
+
+        moved_game_ids = self.router.rebalance()
+
+        self.assertEqual(len(moved_game_ids), 2)
+        self.assertNotIn(game_ids[0], moved_game_ids)
+        self.assertEqual(self.router.get_loads(), [2, 2])
+        for game_id in moved_game_ids:
+            self.assertEqual(self.router.placements[game_id], 1)
+            self.assertEqual(self.router.last_activity[game_id], 0)
+            self.router.execute(
+                game_id, get_allocation(game_id, self.messages, 'red'))
+            self.router.execute(
+                game_id, get_allocation(game_id, self.messages, 'blue'))
+
+        aton = AtonCore(seed=1)
+        spectator_messages = []
+        aton.add_spectator(spectator_messages.append,
+                           MessageFormat.Structured)
+        aton.start()
+        for player in [aton.red, aton.blue]:
+            aton.execute({'player': player.name, 'message': 'allocate_cards',
+                          'cards': player.hand})
+        for game_id in moved_game_ids:
+            self.assertEqual(
+                [message for message_game_id, recipient, message
+                 in self.messages
+                 if message_game_id == game_id and recipient == 'spectator'],
+                spectator_messages)
+
+    def test_sends_bytes_notifications(self):
+        messages = []
+        router = ShardRouter(
+            workers=1, message_format=MessageFormat.Bytes,
+            notifier=lambda *message: messages.append(message))
+        self.addCleanup(router.close)
+
+        router.create_game('a', 1)
+        router.start_game('a')
+
+        aton = AtonCore(seed=1)
+        aton.start()
+        self.assertEqual(
+            [json.loads(message) for _, recipient, message in messages
+             if recipient == 'red'],
+            [{'message': 'cards_drawn', 'cards': aton.red.hand}])
+
+    def test_reads_every_reply_when_notifier_fails(self):
+        def notifier(*message):
+            raise RuntimeError()
+        self.router.notifier = notifier
+        game_ids = [
+            next(game_id for game_id in map(str, range(20))
+                 if get_shard(game_id, 2) == shard)
+            for shard in range(2)]
+
+        self.router.run([('create_game', game_id, 1) for game_id in game_ids])
+        self.router.run([('start_game', game_id) for game_id in game_ids])
+
+        self.assertEqual(self.router.notifier_failures, 4)
+        with self.assertRaises(InvalidCommand):
+            self.router.execute(game_ids[1], {
+                'player': 'red', 'message': 'unknown'})
+
+    def test_places_games_only_when_created(self):
+        results = self.router.run([('start_game', str(i)) for i in range(3)])
+
+        self.assertTrue(all(isinstance(result, KeyError)
+                            for result in results))
+        self.assertEqual(self.router.placements, {})
+        self.assertEqual(self.router.last_activity, {})
+        self.now = 20
+        self.assertEqual(self.router.rebalance(), [])
+
+    def test_keeps_game_when_import_fails(self):
+        self.router.create_game('a', 1)
+        source = self.router.placements['a']
+        call = self.router.call
+
+        def fail_import(operation, game_id, *args, shard=None):
+            if operation == 'import_game' and shard != source:
+                raise ValueError()
+            return call(operation, game_id, *args, shard=shard)
+
+        with patch.object(self.router, 'call', fail_import):
+            with self.assertRaises(ValueError):
+                self.router.move_game('a', 1 - source)
+
+        self.assertEqual(self.router.placements['a'], source)
+        self.assertEqual(self.router.last_activity['a'], 0)
+        self.router.start_game('a')
@@ -0,0 +1,42 @@
+from random import Random
+from unittest import TestCase
+
+from main import AtonCore
+from simulation import GreedyAgent, RandomAgent, play_game, simulate
+
+
+class TestSimulation(TestCase):
+    def test_same_seed_gives_same_game(self):
+        self.assertEqual(play_game(123), play_game(123))
+
+    def test_aggregates_statistics(self):
+        result = simulate(50, seed=7, processes=1, chunk_size=20)
+
+        self.assertEqual(result.games, 50)
+        self.assertEqual(sum(result.wins.values()), 50)
+        self.assertEqual(sum(result.points['red'].values()), 50)
+        self.assertEqual(sum(result.lengths.values()), 50)
+        self.assertAlmostEqual(
+            sum(result.to_dict()['win_rates'].values()), 1.0)
+
+    def test_process_pool_gives_same_results(self):
+        agents = (GreedyAgent, RandomAgent)
+        single = simulate(40, agents, seed=3, processes=1, chunk_size=10)
+        pooled = simulate(40, agents, seed=3, processes=2, chunk_size=10)
+
+        self.assertEqual(single.to_dict(), pooled.to_dict())
+
+    def test_random_agent_removes_owned_tokens(self):
+        aton = AtonCore()
+        for i in range(3):
+            aton.temples[i].tokens[i] = 'blue'
+            aton.temples[i].tokens[i + 1] = 'red'
+        agent = RandomAgent(Random(0))
+
+        removed_tokens = agent.remove_tokens(aton.red, aton, aton.blue, 2, 3)
+
+        self.assertEqual(sum(map(len, removed_tokens)), 2)
+        for temple_index, token_indices in enumerate(removed_tokens):
+            for token_index in token_indices:
+                self.assertEqual(
+                    aton.temples[temple_index].tokens[token_index], 'blue')
@@ -0,0 +1,76 @@
+from unittest import TestCase
+
+from main import AtonCore, MessageFormat, State
+from snapshot import restore, snapshot
+
+
+def get_state(aton):
+    return {
+        'seed': aton.seed,
+        'finished': aton.finished,
+        'state': aton.state,
+        'current_player': str(aton.current_player),
+        'pending_removal': aton.pending_removal and tuple(
+            str(value) for value in aton.pending_removal),
+        'players': [
+            (player.can_exchange_cards, player.tokens_left, player.points,
+             player.deck, player.hand, player.cartouches, player.discard)
+            for player in [aton.red, aton.blue]],
+        'temples': [list(temple.tokens) for temple in aton.temples],
+        'random': aton.random.getstate(),
+    }
+
+
+class TestSnapshot(TestCase):
+    def setUp(self):
+        self.aton = AtonCore(seed=2 ** 70 + 3)
+        self.aton.start()
+        self.aton.execute({'player': 'red', 'message': 'exchange_cards'})
+
+    def test_restores_game_state(self):
+        aton = self.aton
+        aton.red.cartouches = [1, 4, 3, 4]
+        aton.red.points = 300
+        for i in range(4):
+            aton.temples[i].tokens[i] = 'blue'
+            aton.temples[i].tokens[i + 1] = 'blue'
+            aton.temples[i].tokens[11] = 'red'
+        aton.current_player = aton.red
+        aton.state = State.RemovingTokens
+        aton.start()
+
+        restored = restore(snapshot(aton))
+
+        self.assertEqual(get_state(restored), get_state(aton))
+        self.assertEqual(restored.temples[0].count_player_tokens(aton.blue),
+                         2)
+
+    def test_restored_game_continues_identically(self):
+        restored = restore(snapshot(self.aton), [None, None],
+                           MessageFormat.Structured)
+
+        for aton in [self.aton, restored]:
+            aton.execute({'player': 'blue', 'message': 'exchange_cards'})
+            for player in [aton.red, aton.blue]:
+                aton.execute({
+                    'player': player.name,
+                    'message': 'allocate_cards',
+                    'cards': player.hand,
+                })
+
+        self.assertEqual(get_state(restored), get_state(self.aton))
+
+    def test_snapshot_without_random_state_is_compact(self):
+        data = snapshot(self.aton, include_random_state=False)
+
+        self.assertLess(len(data), 200)
+        restored = restore(data)
+        state = get_state(restored)
+        del state['random']
+        expected_state = get_state(self.aton)
+        del expected_state['random']
+        self.assertEqual(state, expected_state)
+
+    def test_rejects_unknown_format(self):
+        with self.assertRaises(ValueError):
+            restore(b'XX' + snapshot(self.aton)[2:])
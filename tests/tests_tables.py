@@ -0,0 +1,80 @@
+import os
+import tempfile
+from random import Random
+from unittest import TestCase
+
+from main import AtonCore, MessageFormat, State
+from tables import (
+    BLUE, CARTOUCHE_COUNT, RED, TIE, OutcomeTables, get_cartouche_index,
+    get_cartouches, get_tables)
+
+
+class TestTables(TestCase):
+    def setUp(self):
+        self.tables = get_tables()
+
+    def test_cartouche_index_round_trip(self):
+        indices = [
+            get_cartouche_index(get_cartouches(index))
+            for index in range(CARTOUCHE_COUNT)]
+
+        self.assertEqual(indices, list(range(CARTOUCHE_COUNT)))
+
+    def test_tables_match_engine(self):
+        random = Random(0)
+        for _ in range(500):
+            red_cartouches = random.choices([1, 2, 3, 4], k=4)
+            blue_cartouches = random.choices([1, 2, 3, 4], k=4)
+            messages = []
+            aton = AtonCore([messages.append, None], random.getrandbits(32),
+                            MessageFormat.Structured)
+            aton.red.cartouches = red_cartouches
+            aton.blue.cartouches = blue_cartouches
+            aton.state = State.Scoring
+            aton.start()
+
+            points, starting_player = self.tables.get_outcome(
+                red_cartouches, blue_cartouches)
+            self.assertEqual(points, aton.red.points - aton.blue.points)
+            selection, = [
+                message for message in messages
+                if message['message'] == 'starting_player_selected']
+            if starting_player == TIE:
+                self.assertTrue(selection['cards_used']['red'])
+            else:
+                self.assertEqual(selection['player'],
+                                 ['red', 'blue'][starting_player])
+                self.assertFalse(selection['cards_used']['red'])
+            tokens_to_remove, max_available_temple = self.tables.get_removal(
+                aton.current_player.cartouches)
+            self.assertEqual(tokens_to_remove,
+                             aton.current_player.cartouches[1] - 2)
+            self.assertEqual(max_available_temple,
+                             aton.current_player.cartouches[2])
+
+    def test_evaluates_allocations_for_both_players(self):
+        red_allocations = self.tables.evaluate_allocations(
+            [4, 1, 1, 1], [2, 1, 3, 3])
+        blue_allocations = self.tables.evaluate_allocations(
+            [4, 1, 1, 1], [2, 1, 3, 3], 'blue')
+
+        self.assertEqual(len(red_allocations), 4)
+        best = max(red_allocations, key=lambda allocation: allocation.points)
+        self.assertEqual(best.cartouches, (4, 1, 1, 1))
+        self.assertEqual(best.points, 4)
+        self.assertFalse(best.starts)
+        self.assertEqual(best.tokens_to_remove, -1)
+        self.assertEqual(red_allocations, blue_allocations)
+
+    def test_saves_and_loads_tables(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tables.bin')
+            self.tables.save(path)
+            loaded = OutcomeTables.load(path)
+
+        self.assertEqual(loaded.points, self.tables.points)
+        self.assertEqual(loaded.starting_players,
+                         self.tables.starting_players)
+        self.assertEqual(loaded.get_removal([1, 4, 3, 1]), (2, 3))
+        self.assertIn(loaded.get_outcome([1, 1, 1, 1], [1, 2, 1, 1])[1],
+                      [RED, BLUE])
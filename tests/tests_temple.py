@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+from main import Player, Temple
+
+
+class TestTemple(TestCase):
+    def setUp(self):
+        self.temple = Temple()
+        self.red = Player('red')
+        self.blue = Player('blue')
+
+    def test_temple_is_empty_by_default(self):
+        self.assertEqual(self.temple.tokens, [''] * 12)
+        self.assertEqual(self.temple.count_player_tokens(self.red), 0)
+        self.assertEqual(self.temple.get_player_tokens(self.red), [])
+
+    def test_counts_player_tokens(self):
+        self.temple.tokens[0] = 'red'
+        self.temple.tokens[5] = 'red'
+        self.temple.tokens[11] = 'blue'
+
+        self.assertEqual(self.temple.count_player_tokens(self.red), 2)
+        self.assertEqual(self.temple.count_player_tokens(self.blue), 1)
+        self.assertEqual(self.temple.get_player_tokens(self.red), [0, 5])
+        self.assertEqual(self.temple.get_player_tokens(self.blue), [11])
+
+    def test_replaces_token_of_other_player(self):
+        self.temple.tokens[3] = 'red'
+        self.temple.tokens[3] = 'blue'
+
+        self.assertEqual(self.temple.tokens[3], 'blue')
+        self.assertEqual(self.temple.count_player_tokens(self.red), 0)
+        self.assertEqual(self.temple.count_player_tokens(self.blue), 1)
+
+    def test_removes_tokens(self):
+        self.temple.tokens[3] = 'red'
+        self.temple.tokens[4] = 'red'
+        self.temple.tokens[3] = ''
+
+        self.assertEqual(self.temple.get_player_tokens(self.red), [4])
+
+        self.temple.remove_player_tokens(self.red)
+
+        self.assertEqual(self.temple.tokens, [''] * 12)
+        self.assertEqual(self.temple.count_player_tokens(self.red), 0)
+
+    def test_assigns_tokens_as_list(self):
+        self.temple.tokens = ['red', '', 'blue'] + [''] * 9
+
+        self.assertEqual(self.temple.tokens[:3], ['red', '', 'blue'])
+        self.assertEqual(self.temple.tokens[-12], 'red')
+        self.assertEqual(list(self.temple.tokens),
+                         ['red', '', 'blue'] + [''] * 9)
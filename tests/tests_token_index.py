@@ -0,0 +1,103 @@
+from random import Random
+from unittest import TestCase
+
+from main import AtonCore, MessageFormat, State
+from snapshot import restore, snapshot
+
+
+def scan_token_counts(aton, player):
+    return [sum(temple.tokens[:].count(player.name)
+                for temple in aton.temples[:temple_count])
+            for temple_count in range(len(aton.temples) + 1)]
+
+
+def scan_token_removal(aton, token_owner, number_of_tokens,
+                       max_available_temple):
+    available_temples = aton.temples[:max_available_temple]
+    token_count = sum(temple.count_player_tokens(token_owner)
+                      for temple in available_temples)
+    if token_count > number_of_tokens:
+        return None
+    tokens = [[], [], [], []]
+    for temple_index, temple in enumerate(available_temples):
+        tokens[temple_index] = [
+            index for index, player_name in enumerate(temple.tokens)
+            if player_name == token_owner.name]
+    return tokens
+
+
+class TestTokenIndex(TestCase):
+    def setUp(self):
+        self.random = Random(0)
+
+    def change_tokens(self, aton):
+        temple = self.random.choice(aton.temples)
+        operation = self.random.randrange(10)
+        if operation < 6:
+            temple.tokens[self.random.randrange(12)] = self.random.choice(
+                ['red', 'blue'])
+        elif operation < 8:
+            temple.tokens[self.random.randrange(12)] = ''
+        elif operation < 9:
+            temple.remove_player_tokens(
+                self.random.choice([aton.red, aton.blue]))
+        else:
+            temple.tokens = [self.random.choice(['red', 'blue', ''])
+                             for _ in range(12)]
+
+    def assert_index_matches_scan(self, aton):
+        for player in [aton.red, aton.blue]:
+            self.assertEqual(
+                [aton.token_index.count_player_tokens(player, temple_count)
+                 for temple_count in range(5)],
+                scan_token_counts(aton, player))
+
+    def test_index_matches_scan(self):
+        aton = AtonCore(seed=0)
+        for step in range(2000):
+            self.change_tokens(aton)
+            if step % 100 == 0:
+                aton = self.random.choice([
+                    aton.clone(), restore(snapshot(aton))])
+            self.assert_index_matches_scan(aton)
+
+        aton.reset(seed=1)
+        self.assert_index_matches_scan(aton)
+
+    def test_token_removal_matches_scan(self):
+        for _ in range(500):
+            aton = AtonCore(seed=0)
+            for _ in range(self.random.randrange(40)):
+                self.change_tokens(aton)
+            aton.current_player = self.random.choice([aton.red, aton.blue])
+            aton.current_player.cartouches = [
+                1, self.random.randint(1, 4), self.random.randint(1, 4), 1]
+            number_of_tokens = aton.current_player.cartouches[1] - 2
+            max_available_temple = aton.current_player.cartouches[2]
+            token_owner = aton.get_other_player(aton.current_player)
+            if number_of_tokens < 0:
+                number_of_tokens = -number_of_tokens
+                token_owner = aton.current_player
+            expected_tokens = scan_token_removal(
+                aton, token_owner, number_of_tokens, max_available_temple)
+            messages = []
+            aton.red.notifier = messages.append
+            aton.red.message_format = MessageFormat.Structured
+
+            aton.state = State.RemovingTokens
+            aton.order_token_removal()
+
+            if number_of_tokens == 0:
+                self.assertEqual(messages, [])
+            elif expected_tokens is None:
+                self.assertEqual(
+                    aton.pending_removal,
+                    (token_owner, number_of_tokens, max_available_temple))
+            else:
+                self.assertIsNone(aton.pending_removal)
+                self.assertEqual(messages[0]['removed_tokens'],
+                                 expected_tokens)
+                self.assertEqual(
+                    aton.token_index.count_player_tokens(
+                        token_owner, max_available_temple), 0)
+            self.assert_index_matches_scan(aton)
@@ -0,0 +1,90 @@
+import json
+from unittest import TestCase
+from unittest.mock import Mock
+
+from main import AtonCore, MessageFormat, State
+
+
+class TestViews(TestCase):
+    def setUp(self):
+        self.aton = AtonCore(seed=4)
+        self.aton.red.deck = [1, 2, 3, 4, 1, 1]
+        self.aton.blue.deck = [4, 4, 3, 3]
+        self.aton.start()
+
+    def test_shows_own_hand_only(self):
+        view = self.aton.get_view('red').message
+
+        self.assertEqual(view['message'], 'game_state')
+        self.assertEqual(view['state'], 'Allocating')
+        self.assertEqual(view['players']['red']['hand'], [1, 2, 3, 4])
+        self.assertNotIn('hand', view['players']['blue'])
+        self.assertEqual(view['players']['blue']['cards_left'], 0)
+        self.assertEqual(view['temples'], [[''] * 12] * 4)
+
+    def test_hides_opponent_cartouches_while_allocating(self):
+        self.aton.execute({
+            'player': 'blue',
+            'message': 'allocate_cards',
+            'cards': [3, 4, 4, 3],
+        })
+
+        red_view = self.aton.get_view('red').message
+        blue_view = self.aton.get_view('blue').message
+        self.assertTrue(red_view['players']['blue']['allocated_cards'])
+        self.assertNotIn('cartouches', red_view['players']['blue'])
+        self.assertEqual(blue_view['players']['blue']['cartouches'],
+                         [3, 4, 4, 3])
+
+        self.aton.execute({
+            'player': 'red',
+            'message': 'allocate_cards',
+            'cards': [1, 2, 3, 4],
+        })
+
+        red_view = self.aton.get_view('red').message
+        self.assertEqual(red_view['players']['blue']['cartouches'],
+                         [3, 4, 4, 3])
+        self.assertEqual(red_view['players']['blue']['points'], 4)
+        self.assertEqual(red_view['state'], State.RemovingTokens.name)
+        self.assertEqual(red_view['current_player'], 'red')
+
+    def test_caches_views_until_next_command(self):
+        view = self.aton.get_view('red')
+        self.assertIs(self.aton.get_view('red'), view)
+        self.assertIs(view.json, view.json)
+
+        self.aton.execute({'player': 'blue', 'message': 'exchange_cards'})
+
+        self.assertIsNot(self.aton.get_view('red'), view)
+
+    def test_spectator_view_has_no_hands(self):
+        view = self.aton.get_view().message
+
+        self.assertIsNone(view['player'])
+        for player_view in view['players'].values():
+            self.assertNotIn('hand', player_view)
+            self.assertNotIn('cartouches', player_view)
+
+    def test_sends_view_to_player(self):
+        notifier = Mock()
+        self.aton.red.notifier = notifier
+        self.aton.red.message_format = MessageFormat.Json
+
+        self.aton.send_view('red')
+
+        notifier.assert_called_once_with(self.aton.get_view('red').json)
+        self.assertEqual(
+            json.loads(notifier.call_args[0][0])['players']['red']['hand'],
+            [1, 2, 3, 4])
+
+    def test_does_not_cache_views_during_a_command(self):
+        aton = AtonCore(seed=1)
+        aton.red.notifier = lambda message: aton.get_view('blue')
+        aton.set_lock()
+        aton.start()
+
+        aton.execute({'player': 'blue', 'message': 'exchange_cards'})
+
+        self.assertEqual(aton.get_view('blue').message['players']['blue'][
+            'hand'], aton.blue.hand)